@@ -0,0 +1,95 @@
+# benchmarks/bench_history.py
+#
+# Round history export and query. Rounds are recorded in batches while a
+# ticker measures how late the event loop wakes up; the export runs in a worker
+# thread, so the lateness should stay near the idle baseline. For comparison the
+# cost of writing one batch directly on the loop is timed too. The query then
+# reads everything back in one streaming pass and reports its rate and peak
+# traced memory, which depends on the number of days, not the number of rounds.
+#
+#   python benchmarks/bench_history.py --rounds 100000 --days 30
+
+import argparse
+import asyncio
+import gc
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from fakes import idle_baseline, ticker
+
+import game_history
+
+
+def make_round(rng, ts, players):
+    uids = [100000000000000000 + rng.randrange(10000) for _ in range(players)]
+    outcome = rng.choice(("caught", "caught", "escaped", "tie", "no_votes"))
+    return dict(
+        ts=ts, game=f"1-{rng.getrandbits(64):016x}", guild=rng.randrange(1, 50), round=rng.randint(1, 4),
+        players=players, imposter=uids[0], pair=f"{rng.getrandbits(64):016x}", outcome=outcome,
+        answers={str(uid): f"Probably around {rng.randint(1, 60)}, depends on the week" for uid in uids},
+        votes={str(uid): rng.choice(uids) for uid in uids[1:]},
+        scores={str(uid): rng.randint(0, 8) for uid in uids},
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--batch", type=int, default=game_history.HISTORY_BATCH)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    start = int(time.time()) - args.days * 86400
+    step = args.days * 86400 / args.rounds
+    records = [make_round(rng, int(start + i * step), rng.randint(3, 10)) for i in range(args.rounds)]
+    gc.freeze()  # The fixture is far more live data than the bot ever holds; keep it out of collections
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inline = game_history.HistoryExporter(os.path.join(tmp, "inline"), batch_size=args.batch)
+        started = time.perf_counter()
+        inline._write(records[: args.batch])
+        inline_ms = (time.perf_counter() - started) * 1000
+
+        exporter = game_history.HistoryExporter(os.path.join(tmp, "history"), batch_size=args.batch)
+        baseline = await idle_baseline(2) * 1000
+        lags, stop = [], asyncio.Event()
+        tick = asyncio.create_task(ticker(lags, stop))
+        started = time.perf_counter()
+        for i, record in enumerate(records):
+            exporter.record(**record)
+            if i % 50 == 0:
+                await asyncio.sleep(0)  # Rounds arrive from many games, interleaved with other work
+            while len(exporter._pending) >= 4 * args.batch:
+                await asyncio.sleep(0.001)  # Far above real traffic; don't outrun the writer and start dropping
+        await exporter.flush()
+        export_s = time.perf_counter() - started
+        stop.set()
+        await tick
+
+        files = os.listdir(exporter.directory)
+        size_mb = sum(os.path.getsize(os.path.join(exporter.directory, name)) for name in files) / 1e6
+
+        started = time.perf_counter()
+        days = game_history.summarise(game_history.iter_rounds(exporter.directory))
+        query_s = time.perf_counter() - started
+        tracemalloc.start()
+        game_history.summarise(game_history.iter_rounds(exporter.directory))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    lags.sort()
+    print(f"Exported {args.rounds} rounds to {len(files)} files ({size_mb:.1f} MB gzip) in {export_s:.2f}s "
+          f"({args.rounds / export_s:,.0f} rounds/s)")
+    print(f"loop lag during export: p99 {lags[int(len(lags) * 0.99)] * 1000:.2f} ms, max {lags[-1] * 1000:.2f} ms "
+          f"(idle max {baseline:.2f} ms); one {args.batch}-round batch written on the loop would block it {inline_ms:.1f} ms")
+    counted = sum(row[0] for row in days.values())
+    print(f"Query: {counted} rounds over {len(days)} days in {query_s:.2f}s ({counted / query_s:,.0f} rounds/s), "
+          f"peak traced memory {peak / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
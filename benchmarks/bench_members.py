@@ -0,0 +1,140 @@
+# benchmarks/bench_members.py
+#
+# Peak RSS and time to ready with low-memory member mode off and on, measured
+# offline. Each mode runs in its own process: the client create_bot() builds is
+# given a READY and one GUILD_CREATE per server, and a stand-in for the gateway
+# answers member requests with GUILD_MEMBERS_CHUNK events of 1000 members, as
+# discord does. Everything goes through discord.py's own state handling, so the
+# default mode chunks and caches every member while low-memory mode keeps only
+# the bot's own. discord.py's wait for further GUILD_CREATEs before ready is
+# cut from 2s to 50ms in both modes. Exits non-zero unless low-memory mode
+# comes out lower on both counts and each mode caches what it should.
+#
+#   python benchmarks/bench_members.py --guilds 10 --members 10000
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import fakes  # noqa: F401  (puts the repo root on sys.path)
+
+import bot
+
+CHUNK_SIZE = 1000  # Members per GUILD_MEMBERS_CHUNK
+READY_WAIT = 0.05
+BOT_ID = 1
+
+
+def user_payload(user_id, name, is_bot=False):
+    return {"id": str(user_id), "username": name, "global_name": None, "discriminator": "0", "avatar": None, "bot": is_bot}
+
+
+def member_payload(user_id, name, is_bot=False):
+    return {"user": user_payload(user_id, name, is_bot), "roles": [], "joined_at": "2024-01-01T00:00:00+00:00",
+            "deaf": False, "mute": False, "flags": 0}
+
+
+def guild_id(index):
+    return 10**15 + index
+
+
+def user_id(guild, i):
+    return 10**16 + guild * 10**7 + i  # Members of different servers are different people
+
+
+def guild_payload(index, members):
+    """A large server's GUILD_CREATE: without the presence intent its member list holds only the bot"""
+    return {"id": str(guild_id(index)), "name": f"Server {index}", "member_count": members + 1, "large": True,
+            "unavailable": False, "owner_id": str(user_id(index, 0)), "features": [], "emojis": [], "stickers": [],
+            "roles": [{"id": str(guild_id(index)), "name": "@everyone", "permissions": "0", "position": 0,
+                       "color": 0, "hoist": False, "managed": False, "mentionable": False}],
+            "channels": [], "threads": [], "voice_states": [], "presences": [],
+            "members": [member_payload(BOT_ID, "imposter-bot", is_bot=True)]}
+
+
+class Gateway:
+    """Stands in for the websocket; a member request is answered with chunk events from a background task"""
+
+    def __init__(self, state, members):
+        self.state = state
+        self.members = members
+        self.tasks = set()
+
+    async def request_chunks(self, guild_id, query=None, *, limit, user_ids=None, presences=False, nonce=None):
+        task = asyncio.create_task(self._send_chunks(guild_id, nonce))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _send_chunks(self, gid, nonce):
+        index = gid - guild_id(0)
+        count = -(-self.members // CHUNK_SIZE)
+        for chunk in range(count):
+            await asyncio.sleep(0)  # Each chunk is a separate gateway message
+            first = chunk * CHUNK_SIZE
+            members = [member_payload(user_id(index, i), f"player{i}")
+                       for i in range(first, min(first + CHUNK_SIZE, self.members))]
+            self.state.parse_guild_members_chunk({"guild_id": str(gid), "members": members, "chunk_index": chunk,
+                                                  "chunk_count": count, "nonce": nonce})
+
+
+async def connect(guilds, members):
+    """Child process: feed READY and the GUILD_CREATEs through the client's state and wait for ready"""
+    client = bot.create_bot()
+    client.remove_listener(bot.on_ready)  # Only discord.py's own startup is measured
+    state = client._connection
+    state.guild_ready_timeout = READY_WAIT
+    gateway = Gateway(state, members)
+    state._get_websocket = lambda guild_id=None, *, shard_id=None: gateway
+    async with client:
+        rss_before = bot.peak_rss_mb()
+        started = time.perf_counter()
+        state.parse_ready({"user": user_payload(BOT_ID, "imposter-bot", is_bot=True), "session_id": "bench",
+                           "application": {"id": str(BOT_ID), "flags": 0},
+                           "guilds": [{"id": str(guild_id(i)), "unavailable": True} for i in range(guilds)]})
+        for i in range(guilds):
+            await asyncio.sleep(0)
+            state.parse_guild_create(guild_payload(i, members))
+        await asyncio.wait_for(client.wait_until_ready(), 600)
+        ready_s = time.perf_counter() - started
+        cached = sum(len(guild.members) for guild in client.guilds)
+        print(json.dumps({"ready_s": ready_s, "rss_before_mb": rss_before, "peak_rss_mb": bot.peak_rss_mb(), "cached": cached}))
+
+
+def run_mode(low_memory, guilds, members):
+    env = dict(os.environ, LOW_MEMORY_MEMBERS="1" if low_memory else "")
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--connect", str(guilds), str(members)],
+                            env=env, capture_output=True, text=True, timeout=900)
+    if result.returncode != 0:
+        sys.exit(f"Child failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--guilds", type=int, default=10)
+    parser.add_argument("--members", type=int, default=10000, help="Members per server, besides the bot")
+    args = parser.parse_args()
+
+    default = run_mode(False, args.guilds, args.members)
+    low = run_mode(True, args.guilds, args.members)
+    print(f"{args.guilds} servers of {args.members:,} members each:")
+    for name, result in (("default", default), ("LOW_MEMORY_MEMBERS=1", low)):
+        print(f"  {name:21} ready in {result['ready_s']:.2f}s, peak RSS {result['peak_rss_mb']:.0f} MB "
+              f"({result['peak_rss_mb'] - result['rss_before_mb']:.0f} MB over the client alone), "
+              f"{result['cached']:,} members cached")
+    print(f"Low-memory mode: {default['peak_rss_mb'] - low['peak_rss_mb']:.0f} MB less peak RSS, "
+          f"ready {default['ready_s'] / low['ready_s']:.0f}x sooner")
+    if (low["peak_rss_mb"] >= default["peak_rss_mb"] or low["ready_s"] >= default["ready_s"]
+            or default["cached"] != args.guilds * (args.members + 1) or low["cached"] > args.guilds):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--connect"]:  # The child process started by run_mode()
+        asyncio.run(connect(int(sys.argv[2]), int(sys.argv[3])))
+    else:
+        main()
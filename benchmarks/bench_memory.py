@@ -0,0 +1,82 @@
+# benchmarks/bench_memory.py
+#
+# Bytes retained per active game (lobby joined, round started, all but one
+# answer in), measured with tracemalloc, plus a check that an ended game that is
+# still referenced somewhere does not keep its guild or members alive. In
+# low-memory mode the participants' LRU entries count towards each game; the
+# guild-wide member cache it replaces is not part of this measurement.
+#
+#   python benchmarks/bench_memory.py
+
+import asyncio
+import gc
+import tracemalloc
+import weakref
+
+from fakes import FakeClient, FakeInteraction, isolated, make_world
+
+import member_cache
+from game_manager import GameManager
+
+
+async def active_game(client, guild, channel, members):
+    game = GameManager(client, guild.id, members[0].id, rounds=4, timer=90, anonymous=None)
+    game.channel = channel
+    for member in members:
+        await game.add_player(FakeInteraction(client, guild, channel, member))
+    game.game_started = True
+    await game.next_round()
+    for member in members[:-1]:
+        await game.submit_answer(FakeInteraction(client, guild, channel, member), f"Probably around {member.id % 97} of them")
+    return game
+
+
+async def bytes_per_game(players, games):
+    client = FakeClient()
+    worlds = [make_world(players, client)[1:] for _ in range(games)]
+    await active_game(client, *worlds[0])  # Warm caches (question weights, interned strings)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = [await active_game(client, *world) for world in worlds]
+    for _, channel, _ in worlds:
+        channel.sent.clear()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    assert len(kept) == games
+    return retained / games
+
+
+async def ended_game_pins_nothing():
+    client, guild, channel, members = make_world(10)
+    game = await active_game(client, guild, channel, members)
+    await game.force_end()
+    await asyncio.sleep(0)  # Let the cancelled status edit task unwind
+    guild_ref = weakref.ref(guild)
+    member_refs = [weakref.ref(m) for m in members]
+    client.forget_guild(guild.id)
+    del guild, channel, members
+    gc.collect()
+    # `game` is still referenced here, as a stale registry entry would be
+    return game is not None and guild_ref() is None and all(ref() is None for ref in member_refs)
+
+
+async def main():
+    # Memory, not pacing, is measured here; let the fake sends through at full speed
+    with isolated():
+        for low_memory in (False, True):
+            # Low-memory mode keeps participants in the bounded LRU instead of the guild's member cache
+            member_cache.cache.maxsize = member_cache.MEMBER_CACHE_SIZE if low_memory else 0
+            print(f"Low-memory members {'on' if low_memory else 'off'}:")
+            for players, games in ((10, 200), (500, 10)):
+                size = await bytes_per_game(players, games)
+                print(f"  {players:4d} players: {size / 1024:8.1f} KiB per active game ({size / players:6.0f} B/player)")
+            print(f"  Ended game releases guild and members: {await ended_game_pins_nothing()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,56 @@
+# benchmarks/bench_messages.py
+#
+# Channel API calls for one timed round against the fake discord layer:
+# everyone answers, all but one player vote spread across the timer, and the
+# timer runs out. Runs in real time, so keep --timer short.
+#
+#   python benchmarks/bench_messages.py --players 10 --timer 20
+
+import argparse
+import asyncio
+
+from fakes import FakeInteraction, isolated, make_world
+
+from game_manager import GameManager
+
+
+async def run_round(players, timer):
+    client, guild, channel, members = make_world(players)
+    game = GameManager(client, guild.id, members[0].id, rounds=1, timer=timer, anonymous=None)
+    game.channel = channel
+    for member in members:
+        await game.add_player(FakeInteraction(client, guild, channel, member))
+    game.game_started = True
+    before = len(channel.sent), channel.edits
+    await game.next_round()
+
+    for member in members[:-1]:
+        await game.submit_answer(FakeInteraction(client, guild, channel, member), f"answer from {member.name}")
+    # The last answer runs the reveal and the whole voting phase, so it goes in the background
+    last = FakeInteraction(client, guild, channel, members[-1])
+    round_task = asyncio.create_task(game.submit_answer(last, "the last answer"))
+    while not game.voting_open:
+        await asyncio.sleep(0.01)
+
+    voters = members[:-1]
+    for member in voters:
+        await asyncio.sleep(timer / (len(voters) + 1))
+        target = next(m for m in members if m.id != member.id)
+        await game.submit_vote(FakeInteraction(client, guild, channel, member), target)
+
+    await round_task
+    return len(channel.sent) - before[0], channel.edits - before[1]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=10)
+    parser.add_argument("--timer", type=int, default=20)
+    args = parser.parse_args()
+    with isolated(fast=False):  # Pacing is part of what is counted here
+        sent, edits = await run_round(args.players, args.timer)
+    print(f"{args.players} players, {args.timer}s timer: {sent} messages sent, {edits} edits for the round")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
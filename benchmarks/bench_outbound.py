@@ -0,0 +1,98 @@
+# benchmarks/bench_outbound.py
+#
+# Latency of critical sends (question DMs) while many games flood the outbound
+# queue with low-priority traffic (status edits, scoreboards, spectator
+# mirrors). The same load runs twice: once with real priority classes and once
+# with everything queued as one class, which is what sending directly amounts
+# to. The global rate is scaled up so the run takes a few seconds; the ratios
+# are what matter. Before that, a scripted check drives the dispatcher's job
+# selection by hand to make sure shedding never strands the jobs queued behind
+# the shed one; the benchmark exits non-zero if it does.
+#
+#   python benchmarks/bench_outbound.py --games 200 --rate 200
+
+import argparse
+import asyncio
+import statistics
+import sys
+
+from fakes import make_world
+
+import outbound
+
+
+async def run(games, rate, prioritised):
+    scheduler = outbound.Outbound(global_rate=rate, max_low_queued=10**6)
+    client = None
+    worlds = []
+    for _ in range(games):
+        client, guild, channel, members = make_world(3, client)
+        worlds.append((channel, members))
+
+    loop = asyncio.get_running_loop()
+    critical, low = [], []
+
+    async def timed(target, priority, into):
+        started = loop.time()
+        await scheduler.send(target, "x", priority if prioritised else outbound.NORMAL)
+        into.append(loop.time() - started)
+
+    # Peak load: every game queues a burst of low-priority traffic to its channel...
+    flood = [asyncio.create_task(timed(channel, outbound.LOW, low)) for channel, _ in worlds for _ in range(5)]
+    # ...while new rounds keep starting and sending their questions
+    dms = []
+    for channel, members in worlds[: games // 4]:
+        await asyncio.sleep(2 / games)
+        dms.extend(asyncio.create_task(timed(member, outbound.CRITICAL, critical)) for member in members)
+    await asyncio.gather(*flood, *dms)
+    return critical, low
+
+
+def enqueue(scheduler, key, priority):
+    call = scheduler.call(key, lambda: None, priority)
+    call.send(None)  # Runs up to awaiting the job; the dispatcher task never gets a turn
+    return call
+
+
+async def shedding_keeps_bucket_live():
+    """Shed the head of a bucket whose later jobs were queued while it was paced; they must still go out"""
+    scheduler = outbound.Outbound(bucket_burst=1, bucket_rate=1, max_low_queued=2)
+    calls = [enqueue(scheduler, "a", outbound.NORMAL)]
+    now = asyncio.get_running_loop().time()
+    assert scheduler._next_job(now) is not None      # Uses channel a's only token
+    calls += [enqueue(scheduler, "a", outbound.LOW) for _ in range(2)]
+    assert scheduler._next_job(now) is None          # a is paced; its second job has no ready entry
+    calls.append(enqueue(scheduler, "b", outbound.CRITICAL))
+    assert scheduler._next_job(now + 1).bucket == "b"  # a is ready again but b goes first
+    calls.append(enqueue(scheduler, "c", outbound.LOW))  # Over the low limit: a's head is shed
+    picked = [job.bucket for t in range(1, 11) for job in [scheduler._next_job(now + t)] if job is not None]
+    for call in calls:
+        call.close()
+    scheduler._task.cancel()
+    return sorted(picked) == ["a", "c"]
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct))]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=200)
+    args = parser.parse_args()
+    live = await shedding_keeps_bucket_live()
+    print(f"Jobs behind a shed job are still sent: {live}")
+    if not live:
+        sys.exit(1)
+    for prioritised in (False, True):
+        critical, low = await run(args.games, args.rate, prioritised)
+        label = "priority classes" if prioritised else "single FIFO class"
+        print(f"{label}: critical p50 {statistics.median(critical) * 1000:6.0f} ms, "
+              f"p99 {percentile(critical, 0.99) * 1000:6.0f} ms | "
+              f"low p50 {statistics.median(low) * 1000:6.0f} ms ({len(critical)} critical, {len(low)} low sends)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+# benchmarks/bench_ready.py
+#
+# Time spent in on_ready, with tree.sync replaced by a stub that takes as long
+# as a slash command sync round trip usually does. Measured for a forced sync
+# (what every ready and every reconnect cost before the schema hash cache), a
+# first start with an empty cache, a restart with unchanged commands and a
+# reconnect. A last run makes the sync fail with a 429 and checks that the
+# checkpoint was still resumed and the background loops still started. Exits
+# non-zero if a restart or reconnect takes longer than the budget, or if a
+# failed sync skipped the startup work.
+#
+#   python benchmarks/bench_ready.py --sync-ms 300 --budget-ms 5
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import discord
+
+import fakes  # noqa: F401  (puts the repo root on sys.path)
+
+os.environ["ENV"] = "PROD"
+os.environ.pop("DEV_GUILD_ID", None)
+
+import bot
+import command_sync
+import metrics
+
+
+class User:
+    id = 1
+
+    def __str__(self):
+        return "bench"
+
+
+class RateLimited(discord.HTTPException):
+    def __init__(self):
+        super().__init__(SimpleNamespace(status=429, reason="Too Many Requests"), "You are being rate limited.")
+
+
+async def ready(reconnect=False, force=False):
+    """Milliseconds one on_ready takes; the background loops it starts are stopped again"""
+    bot.ready_once = reconnect
+    bot.FORCE_COMMAND_SYNC = force
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await bot.on_ready()
+    elapsed = (time.perf_counter() - started) * 1000
+    spawned = len(bot.background_tasks)
+    for task in list(bot.background_tasks):
+        task.cancel()
+    await asyncio.sleep(0)
+    return elapsed, spawned
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sync-ms", type=float, default=300, help="Simulated duration of one tree.sync call")
+    parser.add_argument("--budget-ms", type=float, default=5, help="Budget for a restart or reconnect without a sync")
+    args = parser.parse_args()
+
+    bot.create_app(serve_http=False)
+    client = bot.bot
+    client._connection.user = User()
+    calls = []
+
+    async def sync(guild=None):
+        calls.append(guild)
+        await asyncio.sleep(args.sync_ms / 1000)
+        if fail:
+            raise RateLimited()
+        return client.tree.get_commands(guild=guild)
+
+    client.tree.sync = sync
+    fail = False
+    with tempfile.TemporaryDirectory() as tmp:
+        command_sync.CACHE_PATH = os.path.join(tmp, "sync_cache.json")
+        bot.CHECKPOINT_PATH = os.path.join(tmp, "checkpoint.json")
+
+        forced_ms, _ = await ready(force=True)
+        os.remove(command_sync.CACHE_PATH)
+        cold_ms, _ = await ready()
+        warm_ms, _ = await ready()
+        reconnect_ms, _ = await ready(reconnect=True)
+        syncs = len(calls)
+
+        # A failed sync must not cost the process its resumed games or background loops
+        os.remove(command_sync.CACHE_PATH)
+        with open(bot.CHECKPOINT_PATH, "w", encoding="utf-8") as f:
+            json.dump([], f)
+        fail = True
+        failed_ms, spawned = await ready()
+        resumed = not os.path.exists(bot.CHECKPOINT_PATH)
+        counted = metrics.snapshot()["counters"].get("command_sync.failed", 0)
+
+    print(f"on_ready with tree.sync stubbed at {args.sync_ms:.0f} ms:")
+    print(f"  forced sync (every ready and reconnect before the cache): {forced_ms:.1f} ms")
+    print(f"  first start, empty cache:                                  {cold_ms:.1f} ms")
+    print(f"  restart, commands unchanged:                               {warm_ms:.2f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"  reconnect:                                                 {reconnect_ms:.2f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"  sync calls over those four: {syncs} (expected 2)")
+    print(f"Sync failing with 429: {failed_ms:.1f} ms, checkpoint resumed: {resumed}, background loops started: {spawned}")
+    if warm_ms > args.budget_ms or reconnect_ms > args.budget_ms or syncs != 2 or not resumed or spawned < 2 or not counted:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+# benchmarks/bench_reload.py
+#
+# Event loop stall while a large question bank is reloaded. A ticker wakes up
+# every millisecond during the reload and records how late it was. Every run
+# must keep the 99th percentile of that lateness and its maximum within fixed
+# budgets. A run that fails is repeated up to --retries times, since a single
+# scheduler hiccup on a busy host can push one run over; a stall the reload
+# causes fails every attempt. An untimed reload goes first, so each measured
+# one replaces a bank of the same size. Exits non-zero if any run fails, so it
+# can gate CI.
+#
+#   python benchmarks/bench_reload.py --pairs 100000 --runs 3 --p99-budget-ms 3 --max-budget-ms 50
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from fakes import make_world, ticker
+
+import question_bank
+
+
+def write_bank(path, count):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("QUESTION_PAIRS = [\n")
+        for i in range(count):
+            f.write(f'  {{ "normal": "How many tabs do you have open right now, take {i}?", '
+                    f'"imposter": "How many browser bookmarks do you check weekly, take {i}?" }},\n')
+        f.write("]\n")
+
+
+async def timed_reload(path):
+    """Reload `path` while a ticker runs; returns the bank, the seconds it took and the sorted loop lags in ms"""
+    lags, stop = [], asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    bank = await question_bank.reload(path)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick
+    return bank, elapsed, sorted(lag * 1000 for lag in lags)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pairs", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--p99-budget-ms", type=float, default=3.0)
+    parser.add_argument("--max-budget-ms", type=float, default=50.0)
+    parser.add_argument("--retries", type=int, default=2, help="Extra attempts for a run that goes over a budget")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "questions_big.py")
+        write_bank(path, args.pairs)
+        size_mb = os.path.getsize(path) / 1e6
+
+        from game_manager import GameManager
+        client, guild, _, members = make_world(3)
+        running = GameManager(client, guild.id, members[0].id, rounds=4, timer=90, anonymous=None)
+
+        await question_bank.reload(path)
+        failed_runs = 0
+        for run in range(args.runs):
+            for attempt in range(args.retries + 1):
+                bank, elapsed, lags = await timed_reload(path)
+                p99, worst = lags[int(len(lags) * 0.99)], lags[-1]
+                ok = p99 <= args.p99_budget_ms and worst <= args.max_budget_ms
+                print(f"Run {run + 1}: reloaded {len(bank)} pairs ({size_mb:.1f} MB) in {elapsed:.2f}s; loop lag over {len(lags)} ticks: "
+                      f"p50 {lags[len(lags) // 2]:.2f} ms, p99 {p99:.2f} ms, max {worst:.2f} ms"
+                      f"{'' if ok else ' over budget' + (', retrying' if attempt < args.retries else '')}")
+                if ok:
+                    break
+            else:
+                failed_runs += 1
+
+    print(f"{args.runs - failed_runs}/{args.runs} runs within budget (p99 {args.p99_budget_ms:.0f} ms, max {args.max_budget_ms:.0f} ms)")
+    snapshot_kept = running.bank is not bank and len(running.bank) != len(bank)
+    print(f"Game started before the reload kept its bank: {snapshot_kept}")
+    if failed_runs or not snapshot_kept or len(bank) != args.pairs:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
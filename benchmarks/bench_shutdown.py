@@ -0,0 +1,233 @@
+# benchmarks/bench_shutdown.py
+#
+# Restart hand-off end to end against the fake discord layer. Two games are
+# left mid-vote and the process sends itself a real SIGTERM, handled the way
+# bot.main() installs it. In one game the remaining votes arrive while the bot
+# drains, so it pauses at the round boundary; in the other they never do, so
+# the drain times out. The checkpoint is then read back by
+# resume_checkpointed_games() as the next process would. Exits non-zero unless
+# both games come back with their players and scores, the finished round is
+# kept, the interrupted one is replayed, and both carry on with a new round.
+#
+# The bot is then started for real in a subprocess, through create_app() and
+# main() with only the gateway connection stubbed, and sent a SIGTERM. That run
+# fails unless the process exits on its own and port 8000 is free again. A last
+# run has a game that never finishes its round and checks that a second
+# SIGTERM ends the drain at once.
+#
+#   python benchmarks/bench_shutdown.py --drain-timeout 2
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from types import SimpleNamespace
+
+from fakes import FakeClient, FakeInteraction, isolated, make_world, until
+
+import bot
+from game_manager import GameManager
+
+ROUNDS = 3
+PORT = 8000  # Where keep_alive() serves
+
+
+class Client(FakeClient):
+    def __init__(self):
+        super().__init__()
+        self.closed = asyncio.Event()
+
+    async def close(self):
+        self.closed.set()
+
+
+async def game_in_vote(client, players):
+    """A registered game in round 1 with every answer in and one vote cast; returns it and the other votes, not yet awaited"""
+    _, guild, channel, members = make_world(players, client)
+    game = GameManager(client, guild.id, members[0].id, rounds=ROUNDS, timer=60, anonymous=None)
+    game.channel = channel
+    for member in members:
+        await game.add_player(FakeInteraction(client, guild, channel, member))
+    bot.register_game(guild.id, game)
+    game.game_started = True
+    await game.next_round()
+    for member in members[:-1]:
+        await game.submit_answer(FakeInteraction(client, guild, channel, member), f"answer from {member.name}")
+    # The last answer runs the reveal and the whole voting phase
+    asyncio.create_task(game.submit_answer(FakeInteraction(client, guild, channel, members[-1]), "the last answer"))
+    await until(lambda: game.voting_open)
+
+    def vote(member):
+        target = next(m for m in members if m.id != member.id)
+        return game.submit_vote(FakeInteraction(client, guild, channel, member), target)
+
+    await vote(members[0])  # One vote in before the restart, so the round is genuinely mid-vote
+    return game, [vote(member) for member in members[1:]]
+
+
+def serve(stuck):
+    """Child process: the bot as `python bot.py` runs it, with start() standing in for the gateway connection"""
+    bot.create_app()
+    client = bot.bot
+
+    async def start(token):
+        print("connected")
+        while not client.is_closed():
+            await asyncio.sleep(0.05)
+
+    client.start = start
+    if stuck:
+        bot.games[1] = SimpleNamespace(active=True, game_started=True, suspended=False)  # A round that never ends
+    asyncio.run(bot.main())
+
+
+def port_free():
+    with socket.socket() as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # As the next process's server would
+        try:
+            s.bind(("0.0.0.0", PORT))
+        except OSError:
+            return False
+        return True
+
+
+async def run_bot(tmp, stuck, timeout=30):
+    """Start the bot in a subprocess, SIGTERM it (twice if `stuck`) and return its exit code; None if it had to be killed
+    or exited before it was serving"""
+    env = dict(os.environ, ENV="PROD", DISCORD_TOKEN="bench", PYTHONUNBUFFERED="1", GAME_LOG_DIR="", HISTORY_DIR="",
+               DRAIN_TIMEOUT="600" if stuck else "1", CHECKPOINT_PATH=os.path.join(tmp, "checkpoint.json"),
+               QUESTION_STATS_PATH=os.path.join(tmp, "question_stats.bin"))
+    env.pop("DEV_GUILD_ID", None)
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.abspath(__file__), "--serve", "stuck" if stuck else "idle",
+        cwd=tmp, env=env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+
+    async def wait_for_line(text):
+        while line := await proc.stdout.readline():
+            if text in line.decode():
+                return True
+        return False
+
+    async def listening():
+        while proc.returncode is None:
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", PORT)
+            except OSError:
+                await asyncio.sleep(0.05)
+                continue
+            writer.close()
+            return
+
+    try:
+        connected, _ = await asyncio.wait_for(asyncio.gather(wait_for_line("connected"), listening()), timeout)
+        if connected:
+            proc.send_signal(signal.SIGTERM)
+            if stuck and await asyncio.wait_for(wait_for_line("draining"), timeout):
+                proc.send_signal(signal.SIGTERM)
+            return await asyncio.wait_for(proc.wait(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+    await proc.wait()
+    sys.stderr.write((await proc.stderr.read()).decode())
+    return None
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=5)
+    parser.add_argument("--drain-timeout", type=float, default=2)
+    args = parser.parse_args()
+
+    loop = asyncio.get_running_loop()
+
+    with isolated() as tmp:
+        bot.CHECKPOINT_PATH = os.path.join(tmp, "checkpoint.json")
+        bot.DRAIN_TIMEOUT = args.drain_timeout
+        client = bot.bot = Client()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            finishing, late_votes = await game_in_vote(client, args.players)
+            stalled, never_cast = await game_in_vote(client, args.players)
+            for vote in never_cast:
+                vote.close()
+
+            # The same handler bot.main() installs
+            started = time.perf_counter()
+            try:
+                loop.add_signal_handler(signal.SIGTERM, bot.on_shutdown_signal)
+                os.kill(os.getpid(), signal.SIGTERM)
+            except NotImplementedError:
+                bot.spawn(bot.graceful_shutdown())  # Signal handlers are not available on Windows event loops
+            await until(lambda: bot.draining)
+            for vote in late_votes:
+                await vote
+            closed = await until(client.closed.is_set, args.drain_timeout + 10)
+            shutdown_s = time.perf_counter() - started
+            with contextlib.suppress(NotImplementedError):
+                loop.remove_signal_handler(signal.SIGTERM)
+
+            with open(bot.CHECKPOINT_PATH, encoding="utf-8") as f:
+                entries = {entry["guild_id"]: entry for entry in json.load(f)}
+            expected = {
+                # guild: (players, scores, round kept, round the next process plays)
+                finishing.guild_id: (list(finishing.player_ids), dict(finishing.scores), True, 2),
+                stalled.guild_id: (list(stalled.player_ids), dict(stalled.scores), False, 1),
+            }
+
+            # The old process is gone; whatever it left running goes with it
+            for task in asyncio.all_tasks():
+                if task is not asyncio.current_task():
+                    task.cancel()
+            await asyncio.sleep(0)
+            bot.games.clear()
+            bot.draining = False
+
+            await bot.resume_checkpointed_games()
+            resumed = dict(bot.games)
+            await until(lambda: all(game.current_round == expected[guild][3] and game.imposter_id
+                                    for guild, game in resumed.items()))
+            consumed = not os.path.exists(bot.CHECKPOINT_PATH)
+            for game in resumed.values():
+                await game.force_end()
+
+    print(f"SIGTERM to disconnect: {shutdown_s:.2f}s (drain timeout {args.drain_timeout:.0f}s), closed: {closed}")
+    failed = not closed or not consumed or set(resumed) != set(expected)
+    for name, guild in (("votes finished while draining", finishing.guild_id), ("votes never finished", stalled.guild_id)):
+        players, scores, kept, next_round = expected[guild]
+        entry, game = entries.get(guild), resumed.get(guild)
+        ok = (entry is not None and entry["round_complete"] == kept and game is not None
+              and list(game.player_ids) == players and game.scores == scores and game.current_round == next_round
+              and any(f"Resuming with round {next_round}/{ROUNDS}" in (text or "") for text in game.channel.sent))
+        failed = failed or not ok
+        print(f"  {name}: checkpointed with round 1 {'kept' if kept else 'to replay'}, "
+              f"resumed into round {game.current_round if game else '-'}/{ROUNDS}: {'ok' if ok else 'FAILED'}")
+    print(f"Checkpoint consumed by the next process: {consumed}")
+
+    if not port_free():
+        print(f"Port {PORT} is already in use, so the bot process cannot be checked: FAILED")
+        sys.exit(1)
+    with isolated() as tmp:
+        started = time.perf_counter()
+        code = await run_bot(tmp, stuck=False)
+        exit_s = time.perf_counter() - started
+        released = port_free()
+        stuck_code = await run_bot(tmp, stuck=True)
+    print(f"bot.py process after one SIGTERM: {'exited with ' + str(code) if code is not None else 'still running, killed'} "
+          f"({exit_s:.1f}s from start), port {PORT} released: {released}")
+    print(f"Second SIGTERM during a stuck drain: {'exited with ' + str(stuck_code) if stuck_code is not None else 'still running, killed'}")
+    failed = failed or code != 0 or not released or stuck_code != 1
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--serve"]:  # The child process started by run_bot()
+        serve(sys.argv[2] == "stuck")
+    else:
+        asyncio.run(main())
@@ -0,0 +1,87 @@
+# benchmarks/bench_startup.py
+#
+# Import and startup cost of bot.py, each measured in a fresh interpreter.
+# Import time is the cumulative figure `python -X importtime` reports for the
+# bot module; startup time is how long create_app() then takes to read the
+# configuration, build the client and load the question bank (without the
+# keep-alive server). Importing must not pull in flask or dotenv, load the
+# questions or bind the HTTP port, which the child checks right after the
+# import. Exits non-zero when a median exceeds its budget or any of those
+# happens, so it can gate CI.
+#
+#   python benchmarks/bench_startup.py --runs 5 --import-budget-ms 400 --startup-budget-ms 100
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import os, socket, sys, time
+
+def port_in_use(port):
+    with socket.socket() as s:
+        return s.connect_ex(("127.0.0.1", port)) == 0
+
+in_use_before = port_in_use(8000)
+import bot
+time.sleep(0.2)  # Give a keep-alive thread started by the import time to bind
+bound = not in_use_before and port_in_use(8000)
+loaded = sorted(m for m in ("flask", "dotenv", "questions_custom") if m in sys.modules)
+started = time.perf_counter()
+bot.create_app(serve_http=False)
+print(f"{(time.perf_counter() - started) * 1000:.3f} {','.join(loaded) or '-'} {int(bound)}", flush=True)
+os._exit(0)  # Don't wait on a server thread if the import started one
+"""
+
+
+def run_once():
+    # No DEV_GUILD_ID or token in the environment: importing must not need either
+    env = {k: v for k, v in os.environ.items() if k not in ("DEV_GUILD_ID", "DISCORD_TOKEN")}
+    env["ENV"] = "PROD"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        sys.exit(f"Child failed:\n{result.stderr[-2000:]}")
+    import_us = None
+    modules = []
+    for line in result.stderr.splitlines():
+        # import time: <self us> | <cumulative us> | <indented module name>
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        modules.append((int(self_us), name))
+        if name == "bot":
+            import_us = int(cumulative_us)
+    startup_ms, loaded, bound = result.stdout.splitlines()[-1].split()  # A server started by the import may print first
+    return import_us / 1000, float(startup_ms), [] if loaded == "-" else loaded.split(","), bound == "1", modules
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=400)
+    parser.add_argument("--startup-budget-ms", type=float, default=100)
+    args = parser.parse_args()
+
+    imports, startups, bound = [], [], False
+    for _ in range(args.runs):
+        import_ms, startup_ms, loaded, bound_by_import, modules = run_once()
+        imports.append(import_ms)
+        startups.append(startup_ms)
+        bound = bound or bound_by_import
+    import_ms, startup_ms = statistics.median(imports), statistics.median(startups)
+
+    print(f"import bot: median {import_ms:.0f} ms over {args.runs} runs (budget {args.import_budget_ms:.0f} ms)")
+    print("  heaviest modules (self time): " + ", ".join(f"{name} {us / 1000:.1f} ms" for us, name in sorted(modules, reverse=True)[:5]))
+    print(f"create_app(): median {startup_ms:.1f} ms (budget {args.startup_budget_ms:.0f} ms)")
+    print(f"Imported with bot but meant to be deferred: {', '.join(loaded) or 'none'}; port 8000 bound: {bound}")
+    if import_ms > args.import_budget_ms or startup_ms > args.startup_budget_ms or loaded or bound:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
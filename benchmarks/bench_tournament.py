@@ -0,0 +1,109 @@
+# benchmarks/bench_tournament.py
+#
+# A full tournament against the fake discord layer: every participant signs up,
+# and scripted players answer and vote in each lobby as soon as it lets them.
+# Dramatic pauses, send pacing and the pause between thread creations are
+# skipped, so the run shows what the bracket itself costs. Counts the threads
+# created, the messages sent to channels and threads, the DMs and the status
+# edits, and tracks how many lobbies run at once. Exits non-zero if that ever
+# goes over max_concurrent_lobbies, a lobby is not played to the end, or the
+# tournament does not finish with exactly one champion.
+#
+#   python benchmarks/bench_tournament.py --participants 1000 --lobby-size 6 --max-lobbies 25
+
+import argparse
+import asyncio
+import random
+import re
+import sys
+import time
+
+from fakes import FakeInteraction, isolated, make_world, until
+
+from tournament import Tournament
+
+CHAMPION = re.compile(r"<@(\d+)> is the tournament champion")
+
+
+async def play(client, guild, thread, game, rng):
+    """Answer every round and have everyone vote, the way the lobby's players would"""
+    tasks = []
+    for number in range(1, game.rounds_total + 1):
+        # next_round() posts the status message once the questions are out
+        if not await until(lambda: not game.active or (game.current_round >= number and game.status is not None
+                                                       and not game.voting_open), 60):
+            break
+        if not game.active:
+            break
+        players = [guild.get_member(uid) for uid in game.player_ids]
+        for member in rng.sample(players, len(players)):
+            # The last answer runs the reveal and the whole voting phase
+            tasks.append(asyncio.create_task(game.submit_answer(FakeInteraction(client, guild, thread, member),
+                                                                f"About {rng.randint(1, 60)} I think")))
+        if not await until(lambda: game.voting_open or not game.active, 60):
+            break
+        for member in players:
+            target = rng.choice([m for m in players if m is not member])
+            tasks.append(asyncio.create_task(game.submit_vote(FakeInteraction(client, guild, thread, member), target)))
+    await until(lambda: not game.active, 60)
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--participants", type=int, default=1000)
+    parser.add_argument("--lobby-size", type=int, default=6)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--max-lobbies", type=int, default=25, help="The tournament's max_concurrent_lobbies")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)  # Lobby draws and tie-breaks use the module-level generator
+    rng = random.Random(args.seed)
+    with isolated():
+        client, guild, channel, members = make_world(args.participants)
+        tournament = Tournament(client, guild.id, members[0].id, channel, lobby_size=args.lobby_size, rounds=args.rounds,
+                                max_concurrent_lobbies=args.max_lobbies, spawn_interval=0)
+        for member in members:
+            tournament.add_participant(member.id)
+
+        running, peak, lobbies, players = set(), 0, [], set()
+
+        def on_lobby_start(thread_id, game):
+            nonlocal peak
+            running.add(thread_id)
+            peak = max(peak, len(running))
+            thread = guild.get_channel_or_thread(thread_id)
+            lobbies.append(game)
+            players.add(asyncio.create_task(play(client, guild, thread, game, rng)))
+
+        tournament.on_lobby_start = on_lobby_start
+        tournament.on_lobby_end = running.discard
+
+        started = time.perf_counter()
+        await tournament.run()
+        elapsed = time.perf_counter() - started
+        await asyncio.gather(*players)
+
+    threads = [c for c in guild._channels.values() if c is not channel]
+    posts = sum(len(c.sent) for c in guild._channels.values())
+    dms = sum(m.dms for m in members)
+    edits = sum(c.edits for c in guild._channels.values())
+    unfinished = sum(1 for game in lobbies if game.current_round < game.rounds_total)
+    champions = [int(m.group(1)) for text in channel.sent if text and (m := CHAMPION.search(text))]
+    participants = {member.id for member in members}
+
+    print(f"{args.participants} participants in lobbies of {args.lobby_size}, {args.rounds} rounds each: "
+          f"{tournament.stage} stages, {len(lobbies)} lobbies in {elapsed:.2f}s")
+    print(f"  concurrent lobbies: peak {peak} (max_concurrent_lobbies {args.max_lobbies})")
+    print(f"  create_thread calls: {len(threads)}, channel and thread sends: {posts:,}, DMs: {dms:,}, status edits: {edits:,}")
+    print(f"  lobbies not played to the end: {unfinished}")
+    print(f"  champions announced: {len(champions)}"
+          f"{f' (<@{champions[0]}>)' if len(champions) == 1 else ''}")
+    if (peak > args.max_lobbies or len(threads) != len(lobbies) or unfinished
+            or len(champions) != 1 or champions[0] not in participants):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,223 @@
+# benchmarks/fakes.py
+#
+# Minimal stand-ins for the discord.py objects the bot touches, so games can be
+# driven in-process at full speed without a gateway connection.
+
+import asyncio
+import contextlib
+import itertools
+import os
+import sys
+import tempfile
+
+import discord
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_history  # noqa: E402
+import game_log  # noqa: E402
+import game_manager  # noqa: E402
+import outbound  # noqa: E402
+import question_stats  # noqa: E402
+
+_ids = itertools.count(10**17)
+
+
+class FakeNotFound(discord.NotFound):
+    def __init__(self, text="Unknown Member"):
+        Exception.__init__(self, text)
+
+
+class FakeForbidden(discord.Forbidden):
+    def __init__(self, text="Cannot send messages to this user"):
+        Exception.__init__(self, text)
+
+
+class FakeMessage:
+    def __init__(self, channel, content):
+        self.id = next(_ids)
+        self.channel = channel
+        self.content = content
+
+    async def edit(self, content=None, **kwargs):
+        self.channel.edits += 1
+        self.content = content
+        return self
+
+
+class FakeChannel:
+    def __init__(self, guild, name="general"):
+        self.id = next(_ids)
+        self.guild = guild
+        self.name = name
+        self.sent = []
+        self.edits = 0
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(content)
+        return FakeMessage(self, content)
+
+    async def create_thread(self, name, **kwargs):
+        return self.guild.add_channel(name)
+
+    def permissions_for(self, member):
+        return discord.Permissions.all()
+
+
+class FakeMember:
+    def __init__(self, guild, user_id, name):
+        self.id = user_id
+        self.guild = guild
+        self.name = name
+        self.display_name = name
+        self.mention = f"<@{user_id}>"
+        self.dms = 0
+        self.dm_limit = None  # DMs this member accepts before they start failing
+
+    async def send(self, content=None, **kwargs):
+        if self.dm_limit is not None and self.dms >= self.dm_limit:
+            raise FakeForbidden()
+        self.dms += 1
+
+
+class FakeGuild:
+    def __init__(self, client, name="Test Server"):
+        self.id = next(_ids)
+        self.name = name
+        self._members = {}
+        self._channels = {}
+        self.me = None
+        client._guilds[self.id] = self
+
+    @property
+    def members(self):
+        return list(self._members.values())
+
+    def add_member(self, name=None, user_id=None):
+        user_id = user_id or next(_ids)
+        member = FakeMember(self, user_id, name or f"player{len(self._members)}")
+        self._members[user_id] = member
+        return member
+
+    def remove_member(self, user_id):
+        return self._members.pop(user_id, None)
+
+    def add_channel(self, name="general"):
+        channel = FakeChannel(self, name)
+        self._channels[channel.id] = channel
+        return channel
+
+    def get_member(self, user_id):
+        return self._members.get(user_id)
+
+    async def fetch_member(self, user_id):
+        member = self._members.get(user_id)
+        if member is None:
+            raise FakeNotFound()
+        return member
+
+    def get_channel_or_thread(self, channel_id):
+        return self._channels.get(channel_id)
+
+
+class FakeClient:
+    def __init__(self):
+        self._guilds = {}
+
+    def get_guild(self, guild_id):
+        return self._guilds.get(guild_id)
+
+    def forget_guild(self, guild_id):
+        self._guilds.pop(guild_id, None)
+
+
+class FakeResponse:
+    def __init__(self):
+        self.messages = []
+
+    def is_done(self):
+        return bool(self.messages)
+
+    async def send_message(self, content=None, ephemeral=False, **kwargs):
+        if self.messages:
+            raise RuntimeError("interaction already responded to")
+        self.messages.append((content, ephemeral))
+
+
+class FakeInteraction:
+    def __init__(self, client, guild, channel, user):
+        self.client = client
+        self.guild = guild
+        self.guild_id = guild.id
+        self.channel = channel
+        self.channel_id = channel.id
+        self.user = user
+        self.response = FakeResponse()
+        self.followup = channel
+
+
+def make_world(players, client=None):
+    """A client with one guild, one channel and `players` members"""
+    client = client or FakeClient()
+    guild = FakeGuild(client)
+    channel = guild.add_channel()
+    members = [guild.add_member() for _ in range(players)]
+    return client, guild, channel, members
+
+
+async def no_pause(seconds):
+    await asyncio.sleep(0)
+
+
+async def until(predicate, timeout=5):
+    """Yield to the loop until `predicate()` holds; False if it still doesn't after `timeout` seconds"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        if loop.time() > deadline:
+            return False
+        await asyncio.sleep(0)
+    return True
+
+
+def unthrottled():
+    return outbound.Outbound(global_rate=1e9, bucket_burst=1e9, max_in_flight=10**6)
+
+
+@contextlib.contextmanager
+def isolated(fast=True):
+    """Keep games played by a script out of the bot's files: no game logs or history export, and round
+    outcomes go to a temporary stats file instead of the live one. With `fast`, dramatic pauses are
+    skipped and sends are unthrottled too. Yields the temporary directory."""
+    saved = (game_manager.pause, outbound.scheduler, game_log.LOG_DIR, game_history.exporter.directory, question_stats.STATS_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        if fast:
+            game_manager.pause = no_pause
+            outbound.scheduler = unthrottled()
+        game_log.LOG_DIR = ""
+        game_history.exporter.directory = ""
+        question_stats.STATS_PATH = os.path.join(tmp, "question_stats.bin")
+        try:
+            yield tmp
+        finally:
+            (game_manager.pause, outbound.scheduler, game_log.LOG_DIR,
+             game_history.exporter.directory, question_stats.STATS_PATH) = saved
+
+
+async def idle_baseline(seconds):
+    """Worst loop lag in seconds over `seconds` with nothing else running"""
+    lags, stop = [], asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(seconds)
+    stop.set()
+    await tick
+    return max(lags)
+
+
+async def ticker(lags, stop):
+    """Append how late each 1 ms sleep wakes up, in seconds, until `stop` is set"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + 0.001
+        await asyncio.sleep(0.001)
+        lags.append(loop.time() - expected)
@@ -0,0 +1,228 @@
+# benchmarks/replay.py
+#
+# Re-runs recorded games (game_logs/*.jsonl) against the fake discord layer at
+# full speed: dramatic pauses are skipped, sends are unthrottled, and each
+# player action is issued as soon as the game can accept it. Every game is
+# re-seeded from its log and asked the question pairs recorded for its rounds,
+# so the imposters, outcomes and scores it produces are checked against the
+# recording whatever the current question bank and weights file hold; a
+# mismatch points at a behaviour change, and any game that diverges makes the
+# script exit non-zero. Round outcomes go to a temporary stats file, not the
+# live one. The same corpus doubles as a realistic performance benchmark.
+#
+#   python benchmarks/replay.py game_logs/*.jsonl
+#   python benchmarks/replay.py --synthesize 200 --players 8 --rounds 4   # record a corpus first, then replay it
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from array import array
+from collections import defaultdict, deque
+
+from fakes import FakeClient, FakeGuild, FakeInteraction, isolated, make_world, until
+
+import game_log
+from game_manager import GameManager
+
+CHECKED = ("round", "remove", "outcome", "scores", "end")  # Must come out exactly as recorded
+
+
+def dm_limits(events):
+    """How many DMs each player who later became undeliverable received first"""
+    delivered = defaultdict(int)
+    players = []
+    limits = {}
+    for event in events:
+        kind = event["kind"]
+        if kind == "join":
+            delivered[event["user"]] += 1  # The DM check on /join
+            players.append(event["user"])
+        elif kind in ("begin", "resume"):
+            players = list(event["players"])
+        elif kind == "round":
+            for uid in players:
+                delivered[uid] += 1
+        elif kind == "remove":
+            if event["reason"] == "dm_failed":
+                limits[event["user"]] = delivered[event["user"]] - 1
+            if event["user"] in players:
+                players.remove(event["user"])
+    return limits
+
+
+class RecordedBank:
+    """Hands a replayed game the pairs its recording was asked, in order"""
+
+    def __init__(self, events):
+        self.pairs = deque({"normal": e["normal"], "imposter": e["imposter_question"]} for e in events if e["kind"] == "round")
+        self.version = events[0].get("bank_version")
+
+    def __len__(self):
+        return len(self.pairs)
+
+    def choose(self, rng):
+        rng.random()  # The draw QuestionBank.choose makes, so the imposter picks that follow stay in step
+        return self.pairs.popleft()
+
+
+class Replay:
+    def __init__(self, events):
+        self.events = events
+        start = events[0]
+        self.client = FakeClient()
+        self.guild = FakeGuild(self.client)
+        self.channel = self.guild.add_channel()
+        self.game = GameManager(self.client, self.guild.id, start["host"], rounds=start["rounds"], timer=start["timer"],
+                                anonymous=None, no_vote_timer=start["no_vote_timer"], seed=start["seed"])
+        self.game.channel = self.channel
+        self.game.bank = RecordedBank(events)
+        self.host = start["host"]
+        self.tasks = []
+        self.votes = []
+        self.round = 0
+        for uid, limit in dm_limits(events).items():
+            self.member(uid).dm_limit = limit
+
+    def member(self, uid):
+        return self.guild.get_member(uid) or self.guild.add_member(user_id=uid)
+
+    def interaction(self, uid):
+        return FakeInteraction(self.client, self.guild, self.channel, self.member(uid))
+
+    def act(self, coro):
+        self.tasks.append(asyncio.create_task(coro))
+
+    async def run(self):
+        game = self.game
+        for event in self.events[1:]:
+            kind = event["kind"]
+            if kind == "join":
+                await game.add_player(self.interaction(event["user"]))
+            elif kind == "begin":
+                if game.player_ids:
+                    self.act(game.begin_game(self.interaction(self.host)))
+                else:
+                    # Tournament lobbies start with a fixed roster instead of /join
+                    self.act(game.begin_with_players(self.channel, event["players"]))
+            elif kind == "resume":
+                game.player_ids = array("Q", event["players"])
+                game.scores = {int(uid): pts for uid, pts in event["scores"].items()}
+                game.current_round = event["round"]
+                game.game_started = event["started"]
+                if game.game_started:
+                    self.act(game.next_round())
+            elif kind == "round":
+                self.round = event["round"]
+                self.votes = []
+                await until(lambda: game.current_round >= self.round or not game.active)
+            elif kind == "answer":
+                self.act(game.submit_answer(self.interaction(event["user"]), event["text"]))
+            elif kind == "voting":
+                await until(lambda: game.voting_open or not game.active)
+            elif kind == "vote":
+                task = asyncio.create_task(game.submit_vote(self.interaction(event["user"]), self.member(event["target"])))
+                self.tasks.append(task)
+                self.votes.append(task)
+            elif kind == "voting_closed":
+                await until(lambda: all(task.done() for task in self.votes))
+                if game.voting_open:
+                    # Recorded as a timeout or /endround; close it the way /endround does
+                    game.voting_open = False
+                    game.votes_done_event.set()
+            elif kind == "remove" and event["reason"] != "dm_failed":
+                if event["user"] in game.player_ids:
+                    await game.remove_player(event["user"])
+            elif kind == "end":
+                if event["reason"] == "completed":
+                    await until(lambda: not game.active)
+                elif game.active:
+                    await game.end_game_with_results(event["reason"])
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        return self.mismatches()
+
+    def mismatches(self):
+        def checked(events):
+            return [{k: v for k, v in e.items() if k not in ("seq", "t")} for e in events if e["kind"] in CHECKED]
+        recorded, replayed = checked(self.events), checked(self.game.log.events)
+        bad = [(a, b) for a, b in zip(recorded, replayed) if a != b]
+        if len(recorded) != len(replayed):
+            bad.append((f"{len(recorded)} checked events", f"{len(replayed)} replayed"))
+        return bad
+
+
+async def synthesize(directory, count, players, rounds, seed):
+    """Record `count` scripted games with random answers and votes into `directory`"""
+    rng = random.Random(seed)
+    game_log.LOG_DIR = directory
+    try:
+        for _ in range(count):
+            client, guild, channel, members = make_world(players)
+            game = GameManager(client, guild.id, members[0].id, rounds=rounds, timer=90, anonymous=None, seed=rng.getrandbits(64))
+            game.channel = channel
+            for member in members:
+                await game.add_player(FakeInteraction(client, guild, channel, member))
+            tasks = [asyncio.create_task(game.begin_game(FakeInteraction(client, guild, channel, members[0])))]
+            for number in range(1, rounds + 1):
+                await until(lambda: game.current_round >= number or not game.active)
+                for member in rng.sample(members, len(members)):
+                    tasks.append(asyncio.create_task(game.submit_answer(FakeInteraction(client, guild, channel, member), f"About {rng.randint(1, 60)} I think")))
+                await until(lambda: game.voting_open or not game.active)
+                voters = [m for m in members if m.id in game.player_ids]
+                votes = []
+                for member in voters:
+                    if rng.random() < 0.9:  # Some players never vote, so the round has to be closed
+                        target = rng.choice([m for m in voters if m is not member])
+                        votes.append(asyncio.create_task(game.submit_vote(FakeInteraction(client, guild, channel, member), target)))
+                await until(lambda: all(task.done() for task in votes))
+                if game.voting_open:
+                    game.voting_open = False
+                    game.votes_done_event.set()
+                tasks.extend(votes)
+            await until(lambda: not game.active)
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        game_log.LOG_DIR = ""
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("logs", nargs="*", help="Recorded game logs to replay")
+    parser.add_argument("--synthesize", type=int, default=0, metavar="N", help="Record N scripted games and replay those")
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # Replayed games keep their events in memory for the comparison
+    with isolated() as tmp:
+        logs = os.path.join(tmp, "logs")
+        paths = list(args.logs)
+        if args.synthesize:
+            await synthesize(logs, args.synthesize, args.players, args.rounds, args.seed)
+            paths += sorted(os.path.join(logs, name) for name in os.listdir(logs))
+        if not paths:
+            parser.error("give some logs to replay or --synthesize N")
+        corpus = [game_log.read(path) for path in paths]
+
+        started = time.perf_counter()
+        diverged = 0
+        for path, events in zip(paths, corpus):
+            mismatches = await Replay(events).run()
+            if mismatches:
+                diverged += 1
+                print(f"{os.path.basename(path)}: diverged at {mismatches[0][0]} (replayed {mismatches[0][1]})")
+        elapsed = time.perf_counter() - started
+
+    rounds = sum(1 for events in corpus for e in events if e["kind"] == "round")
+    actions = sum(1 for events in corpus for e in events if e["kind"] in ("join", "answer", "vote"))
+    print(f"Replayed {len(corpus)} games, {rounds} rounds, {actions} player actions in {elapsed:.2f}s "
+          f"({len(corpus) / elapsed:,.0f} games/s, {actions / elapsed:,.0f} actions/s); {diverged} diverged")
+    if diverged:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
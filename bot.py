@@ -1,55 +1,139 @@
+import time
+STARTED_AT = time.perf_counter()  # Taken before the heavy imports so ready time covers them
+
+if __name__ == "__main__":
+    # Modules read their settings from the environment as they are imported, so .env has to be loaded first
+    from dotenv import load_dotenv
+    load_dotenv()
+
 import discord
 from discord.ext import commands
 from discord import app_commands
 import os
-from dotenv import load_dotenv
+import json
+import signal
+import asyncio
 from game_manager import GameManager
-from flask import Flask
+from tournament import Tournament
+import metrics
+import command_sync
+import member_cache
+import question_bank
+import rate_limit
+import outbound
+import game_history
+import moderation
+from game_reaper import reaper
 from threading import Thread
 
-load_dotenv()
-TOKEN = os.getenv("DISCORD_TOKEN")
-ENV = os.getenv("ENV", "DEV")
-DEV_GUILD_ID = os.getenv("DEV_GUILD_ID")
-DEV_GUILD = discord.Object(id=int(DEV_GUILD_ID))
+# Configuration is read by create_app(), so importing this module has no side effects
+TOKEN = None
+ENV = "DEV"
+DEV_GUILD_ID = None
+DEV_GUILD = None
+FORCE_COMMAND_SYNC = False
+CHECKPOINT_PATH = "game_checkpoint.json"
+DRAIN_TIMEOUT = 60  # Seconds to let running rounds finish on shutdown
+bot = None  # Built by create_app() once the configuration is loaded
 
 # Keep-alive HTTP endpoint
-app = Flask('')
-@app.route('/')
-def home():
-    return "Bot is running."
+def create_http_app():
+    from flask import Flask, jsonify  # Only the running bot needs flask; tools importing this module don't pay for it
+    app = Flask('')
+
+    @app.route('/')
+    def home():
+        return "Bot is running."
 
-def run():
-    app.run(host='0.0.0.0', port=8000)
+    @app.route('/metrics')
+    def metrics_endpoint():
+        return jsonify(metrics.snapshot())
 
-def keep_alive():
-    t = Thread(target=run)
+    return app
+
+def keep_alive(port=8000):
+    app = create_http_app()
+    t = Thread(target=app.run, kwargs={"host": "0.0.0.0", "port": port}, daemon=True)  # Must not keep the process alive after the bot closes
     t.start()
+    return t
 
-keep_alive()
+def create_app(serve_http=True):
+    """Read the configuration, build the client, load the question bank and moderation list and start the keep-alive server"""
+    global TOKEN, ENV, DEV_GUILD_ID, DEV_GUILD, FORCE_COMMAND_SYNC, CHECKPOINT_PATH, DRAIN_TIMEOUT, bot
+    TOKEN = os.getenv("DISCORD_TOKEN")
+    ENV = os.getenv("ENV", "DEV")
+    DEV_GUILD_ID = os.getenv("DEV_GUILD_ID")
+    if DEV_GUILD_ID:
+        DEV_GUILD = discord.Object(id=int(DEV_GUILD_ID))
+    elif ENV == "DEV":
+        raise ValueError("DEV_GUILD_ID must be set when ENV=DEV")
+    FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "").lower() in ("1", "true", "yes")
+    CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", CHECKPOINT_PATH)
+    DRAIN_TIMEOUT = int(os.getenv("DRAIN_TIMEOUT", str(DRAIN_TIMEOUT)))
+    bot = create_bot()
+    # Validate questions and the word list before connecting, so a broken file fails the deploy rather than the first game
+    question_bank.current()
+    moderation.current()
+    if serve_http:
+        keep_alive()
+    return bot
 
 games = {}  # guild_id: GameManager
+lobby_games = {}  # thread_id: GameManager for tournament lobbies
+tournaments = {}  # guild_id: Tournament
+draining = False  # Set once shutdown starts; no new games are accepted
+ready_once = False  # on_ready fires again after every reconnect; startup work runs only the first time
+background_tasks = set()  # Strong references to fire-and-forget tasks
+
+def spawn(coro):
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+def register_game(guild_id, game):
+    games[guild_id] = game
 
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
+    # Set up cleanup callback
+    async def cleanup_callback():
+        if games.get(guild_id) is game:
+            del games[guild_id]
+    game._cleanup_callback = cleanup_callback
 
-bot = commands.Bot(command_prefix="/", intents=intents)
-tree = bot.tree
+def find_game(interaction):
+    """Commands sent inside a tournament lobby thread go to that lobby, everything else to the server's game"""
+    return lobby_games.get(interaction.channel_id) or games.get(interaction.guild_id)
+
+def forget_game(game):
+    """Drop a finished game from whichever registry holds it"""
+    for registry in (games, lobby_games):
+        for key, value in list(registry.items()):
+            if value is game:
+                del registry[key]
+
+class ThrottledTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction):
+        """Runs before every slash command; spammed commands stop here before any validation"""
+        return await rate_limit.check_interaction(interaction)
 
 # Slash Commands
-@tree.command(name="ping", description="Test command")
+@app_commands.command(name="ping", description="Test command")
 async def ping(interaction: discord.Interaction):
     await interaction.response.send_message("Pong!")
 
-@tree.command(name="startgame", description="Start a new game session")
+@app_commands.command(name="startgame", description="Start a new game session")
 @app_commands.describe(
     rounds="How many rounds to play (default: 4)",
     timer="Timer for discussion/voting in seconds (default: 90)",
-    no_vote_timer="No timer for voting? (default: false)"
+    no_vote_timer="No timer for voting? (default: false)",
+    spectators="Let channels in other servers /spectate this game? (default: false)"
 )
-async def startgame(interaction: discord.Interaction, rounds: int = 4, timer: int = 90, no_vote_timer: bool = False):
+async def startgame(interaction: discord.Interaction, rounds: int = 4, timer: int = 90, no_vote_timer: bool = False,
+                    spectators: bool = False):
     guild_id = interaction.guild_id
+    if draining:
+        await interaction.response.send_message("The bot is restarting. Please try again in a minute.", ephemeral=True)
+        return
     
     # Validate parameters
     if rounds < 1 or rounds > 20:
@@ -70,25 +154,20 @@ async def startgame(interaction: discord.Interaction, rounds: int = 4, timer: in
     
     # Check if host can receive DMs
     try:
-        await interaction.user.send("Game creation test - you can safely ignore this message.")
+        await outbound.send(interaction.user, "Game creation test - you can safely ignore this message.", outbound.CRITICAL)
         # If DM succeeds, create the game
-        game = GameManager(guild=interaction.guild, host=interaction.user, rounds=rounds, timer=timer, anonymous=None, no_vote_timer=no_vote_timer)
-        games[guild_id] = game
-        
-        # Set up cleanup callback
-        async def cleanup_callback():
-            if guild_id in games:
-                del games[guild_id]
-        game._cleanup_callback = cleanup_callback
+        game = GameManager(interaction.client, guild_id, interaction.user.id, rounds=rounds, timer=timer, anonymous=None, no_vote_timer=no_vote_timer,
+                           spectators=spectators)
+        register_game(guild_id, game)
         
         await game.start_lobby(interaction)
     except Exception:
         await interaction.response.send_message("I can't DM you. Please enable DMs from server members to host a game.", ephemeral=True)
         return
 
-@tree.command(name="join", description="Join the game session")
+@app_commands.command(name="join", description="Join the game session")
 async def join(interaction: discord.Interaction):
-    game = games.get(interaction.guild_id)
+    game = find_game(interaction)
     if not game:
         await interaction.response.send_message("No game has been started. Use /startgame first.", ephemeral=True)
         return
@@ -97,9 +176,9 @@ async def join(interaction: discord.Interaction):
         return
     await game.add_player(interaction)
 
-@tree.command(name="start", description="Start the actual game after players join")
+@app_commands.command(name="start", description="Start the actual game after players join")
 async def start(interaction: discord.Interaction):
-    game = games.get(interaction.guild_id)
+    game = find_game(interaction)
     if not game:
         await interaction.response.send_message("No game session found.", ephemeral=True)
         return
@@ -111,10 +190,10 @@ async def start(interaction: discord.Interaction):
         return
     await game.begin_game(interaction)
 
-@tree.command(name="answer", description="Submit your answer")
+@app_commands.command(name="answer", description="Submit your answer")
 @app_commands.describe(text="Your answer to the question")
 async def answer(interaction: discord.Interaction, text: str):
-    game = games.get(interaction.guild_id)
+    game = find_game(interaction)
     if not game:
         await interaction.response.send_message("No game in progress.", ephemeral=True)
         return
@@ -132,10 +211,10 @@ async def answer(interaction: discord.Interaction, text: str):
         
     await game.submit_answer(interaction, text.strip())
 
-@tree.command(name="vote", description="Vote who you think is the imposter")
+@app_commands.command(name="vote", description="Vote who you think is the imposter")
 @app_commands.describe(user="Mention the player you vote for")
 async def vote(interaction: discord.Interaction, user: discord.Member):
-    game = games.get(interaction.guild_id)
+    game = find_game(interaction)
     if not game:
         await interaction.response.send_message("No game in progress.", ephemeral=True)
         return
@@ -143,16 +222,11 @@ async def vote(interaction: discord.Interaction, user: discord.Member):
         await interaction.response.send_message("This game has ended.", ephemeral=True)
         return
     
-    # Check if target user is still in server
-    if not discord.utils.get(interaction.guild.members, id=user.id):
-        await interaction.response.send_message("That user is no longer in the server.", ephemeral=True)
-        return
-        
     await game.submit_vote(interaction, user)
 
-@tree.command(name="scoreboard", description="Show the current leaderboard")
+@app_commands.command(name="scoreboard", description="Show the current leaderboard")
 async def scoreboard(interaction: discord.Interaction):
-    game = games.get(interaction.guild_id)
+    game = find_game(interaction)
     if not game:
         await interaction.response.send_message("No game in progress.", ephemeral=True)
         return
@@ -164,10 +238,38 @@ async def scoreboard(interaction: discord.Interaction):
         return
     await game.show_scoreboard(interaction)
 
-@tree.command(name="endgame", description="Force end the current game")
-async def endgame(interaction: discord.Interaction):
-    guild_id = interaction.guild_id
+@app_commands.command(name="spectate", description="Mirror a game's reveals, results and scores into this channel")
+@app_commands.describe(server_id="ID of the server running the game (default: this server)")
+async def spectate(interaction: discord.Interaction, server_id: str = None):
+    try:
+        guild_id = int(server_id) if server_id else interaction.guild_id
+    except ValueError:
+        await interaction.response.send_message("That isn't a valid server ID.", ephemeral=True)
+        return
     game = games.get(guild_id)
+    # Another server's game can only be followed if its host opted in; otherwise it is reported as not running
+    if not game or not game.active or (guild_id != interaction.guild_id and not game.spectators):
+        await interaction.response.send_message("No game open to spectators is running in that server.", ephemeral=True)
+        return
+    if game.channel_id == interaction.channel_id:
+        await interaction.response.send_message("This channel is already hosting the game.", ephemeral=True)
+        return
+    if not interaction.channel.permissions_for(interaction.guild.me).send_messages:
+        await interaction.response.send_message("I don't have permission to send messages in this channel.", ephemeral=True)
+        return
+    game.events.subscribe(interaction.channel)
+    await interaction.response.send_message("📺 This channel is now spectating the game. Use `/unspectate` to stop.")
+
+@app_commands.command(name="unspectate", description="Stop mirroring a game into this channel")
+async def unspectate(interaction: discord.Interaction):
+    if not any([game.events.unsubscribe(interaction.channel_id) for game in list(games.values()) if game.has_spectators]):
+        await interaction.response.send_message("This channel isn't spectating any game.", ephemeral=True)
+        return
+    await interaction.response.send_message("This channel is no longer spectating.")
+
+@app_commands.command(name="endgame", description="Force end the current game")
+async def endgame(interaction: discord.Interaction):
+    game = find_game(interaction)
     if not game:
         await interaction.response.send_message("No game is currently running.", ephemeral=True)
         return
@@ -176,24 +278,23 @@ async def endgame(interaction: discord.Interaction):
         return
     
     # Check if user is host or if host left server
-    host_in_server = discord.utils.get(interaction.guild.members, id=game.host.id)
-    if interaction.user != game.host and host_in_server:
+    host_in_server = game.host_present
+    if interaction.user.id != game.host_id and host_in_server:
         await interaction.response.send_message("Only the host can end the game.", ephemeral=True)
         return
       # If host left, allow any player to end
-    if not host_in_server and not any(p.id == interaction.user.id for p in game.players):
+    if not host_in_server and interaction.user.id not in game.player_ids:
         await interaction.response.send_message("Only players in the game can end it.", ephemeral=True)
         return
     
     await game.force_end()
-    if guild_id in games:
-        del games[guild_id]
+    forget_game(game)
     await interaction.response.send_message("The game has been forcefully ended.")
 
-@tree.command(name="endround", description="Force end the current round and optionally remove a player")
+@app_commands.command(name="endround", description="Force end the current round and optionally remove a player")
 @app_commands.describe(user="Mention a player to remove from the game (optional)")
 async def endround(interaction: discord.Interaction, user: discord.Member = None):
-    game = games.get(interaction.guild_id)
+    game = find_game(interaction)
     if not game:
         await interaction.response.send_message("No game in progress.", ephemeral=True)
         return
@@ -205,26 +306,25 @@ async def endround(interaction: discord.Interaction, user: discord.Member = None
         return
     
     # Check if user is host or if host left server
-    host_in_server = discord.utils.get(interaction.guild.members, id=game.host.id)
-    if interaction.user != game.host and host_in_server:
+    host_in_server = game.host_present
+    if interaction.user.id != game.host_id and host_in_server:
         await interaction.response.send_message("Only the host can end the round.", ephemeral=True)
         return
     
     # If host left, allow any player to end
-    if not host_in_server and not any(p.id == interaction.user.id for p in game.players):
+    if not host_in_server and interaction.user.id not in game.player_ids:
         await interaction.response.send_message("Only players in the game can end the round.", ephemeral=True)
         return
     
     if user:
-        if not any(p.id == user.id for p in game.players):
+        if user.id not in game.player_ids:
             await interaction.response.send_message("That user is not in the game.", ephemeral=True)
             return
-        await game.remove_player(user)
+        await game.remove_player(user.id)
         await interaction.response.send_message(f"{user.mention} has been removed from the game.")
-        if len(game.players) < 3:
+        if len(game.player_ids) < 3:
             await game.force_end()
-            if interaction.guild_id in games:
-                del games[interaction.guild_id]
+            forget_game(game)
             await interaction.followup.send("Not enough players to continue. The game has ended.")
             return
     else:
@@ -234,37 +334,326 @@ async def endround(interaction: discord.Interaction, user: discord.Member = None
     if game.votes_done_event:
         game.votes_done_event.set()
 
-@bot.event
+@app_commands.command(name="reloadquestions", description="Reload the question bank without restarting (bot owner only)")
+async def reloadquestions(interaction: discord.Interaction):
+    if not await interaction.client.is_owner(interaction.user):
+        await interaction.response.send_message("Only the bot owner can reload questions.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    previous = question_bank.current()
+    started = time.perf_counter()
+    try:
+        bank = await question_bank.reload()
+    except ValueError as e:
+        await interaction.followup.send(f"❗ The question bank was not reloaded: {e}", ephemeral=True)
+        return
+    await interaction.followup.send(
+        f"✅ Loaded {len(bank)} question pairs (was {len(previous)}) in {time.perf_counter() - started:.1f}s. "
+        f"Games already running keep their current questions.",
+        ephemeral=True,
+    )
+
+# Tournament commands
+tournament_group = app_commands.Group(name="tournament", description="Run a bracket tournament across many lobbies")
+
+@tournament_group.command(name="create", description="Open tournament registration in this channel")
+@app_commands.describe(
+    lobby_size="Players per lobby (default: 6)",
+    advance="Players advancing from each lobby, 1 or 2 (default: 1)",
+    rounds="Rounds played in each lobby (default: 3)",
+    timer="Timer for discussion/voting in seconds (default: 90)"
+)
+async def tournament_create(interaction: discord.Interaction, lobby_size: int = 6, advance: int = 1, rounds: int = 3, timer: int = 90):
+    guild_id = interaction.guild_id
+    if draining:
+        await interaction.response.send_message("The bot is restarting. Please try again in a minute.", ephemeral=True)
+        return
+    if lobby_size < 3 or lobby_size > 20:
+        await interaction.response.send_message("Lobby size must be between 3 and 20.", ephemeral=True)
+        return
+    if advance < 1 or advance > 2:
+        await interaction.response.send_message("Advancing players per lobby must be 1 or 2.", ephemeral=True)
+        return
+    if rounds < 1 or rounds > 20:
+        await interaction.response.send_message("Rounds must be between 1 and 20.", ephemeral=True)
+        return
+    if timer < 10 or timer > 600:
+        await interaction.response.send_message("Timer must be between 10 and 600 seconds.", ephemeral=True)
+        return
+    if guild_id in tournaments and tournaments[guild_id].active:
+        await interaction.response.send_message("A tournament is already running in this server.", ephemeral=True)
+        return
+    permissions = interaction.channel.permissions_for(interaction.guild.me)
+    if not permissions.send_messages or not permissions.create_public_threads:
+        await interaction.response.send_message("I need permission to send messages and create threads in this channel.", ephemeral=True)
+        return
+
+    tournament = Tournament(
+        client=interaction.client, guild_id=guild_id, host_id=interaction.user.id, channel=interaction.channel,
+        lobby_size=lobby_size, advance=advance, rounds=rounds, timer=timer
+    )
+    tournament.on_lobby_start = lobby_games.__setitem__
+    tournament.on_lobby_end = lambda thread_id: lobby_games.pop(thread_id, None)
+    tournaments[guild_id] = tournament
+    await interaction.response.send_message(
+        f"🏟️ A **Guess the Imposter** tournament is open for registration!\n"
+        f"Type `/tournament join` to sign up.\n"
+        f"Lobbies of {lobby_size} | Top {advance} advance | {rounds} rounds per lobby | Timer: {timer}s\n"
+        f"The host must run `/tournament start` once everyone has joined."
+    )
+
+@tournament_group.command(name="join", description="Sign up for the tournament")
+async def tournament_join(interaction: discord.Interaction):
+    tournament = tournaments.get(interaction.guild_id)
+    if not tournament or not tournament.active:
+        await interaction.response.send_message("No tournament is open. Use /tournament create first.", ephemeral=True)
+        return
+    if tournament.started:
+        await interaction.response.send_message("Registration has closed.", ephemeral=True)
+        return
+    if interaction.user.id in tournament.participants:
+        await interaction.response.send_message("You're already signed up.", ephemeral=True)
+        return
+    try:
+        await outbound.send(interaction.user, "✅ Test successful - you can receive DMs! You can safely ignore this message.", outbound.CRITICAL)
+    except Exception:
+        await interaction.response.send_message("I can't DM you. Please enable DMs from server members to join.", ephemeral=True)
+        return
+    tournament.add_participant(interaction.user.id)
+    await interaction.response.send_message(f"{interaction.user.mention} signed up! ({len(tournament.participants)} players)")
+
+async def run_tournament(guild_id, tournament):
+    try:
+        await tournament.run()
+    except Exception as e:
+        await outbound.send(tournament.channel, f"❗ An unexpected error occurred during the tournament: {str(e)}. The tournament has ended.")
+    finally:
+        if tournaments.get(guild_id) is tournament:
+            del tournaments[guild_id]
+
+@tournament_group.command(name="start", description="Close registration and start the first stage")
+async def tournament_start(interaction: discord.Interaction):
+    tournament = tournaments.get(interaction.guild_id)
+    if not tournament or not tournament.active:
+        await interaction.response.send_message("No tournament is open.", ephemeral=True)
+        return
+    if interaction.user.id != tournament.host_id:
+        await interaction.response.send_message("Only the host can start the tournament.", ephemeral=True)
+        return
+    if tournament.started:
+        await interaction.response.send_message("The tournament has already started.", ephemeral=True)
+        return
+    if len(tournament.participants) < 3:
+        await interaction.response.send_message("At least 3 players are required to start.", ephemeral=True)
+        return
+    tournament.started = True
+    await interaction.response.send_message(f"Starting the tournament with {len(tournament.participants)} players...")
+    tournament.task = spawn(run_tournament(interaction.guild_id, tournament))
+
+@tournament_group.command(name="status", description="Show tournament progress and standings")
+async def tournament_status(interaction: discord.Interaction):
+    tournament = tournaments.get(interaction.guild_id)
+    if not tournament or not tournament.active:
+        await interaction.response.send_message("No tournament is running.", ephemeral=True)
+        return
+    if not tournament.started:
+        await interaction.response.send_message(f"Registration is open with {len(tournament.participants)} players.", ephemeral=True)
+        return
+    msg = f"🏟️ Stage {tournament.stage} | {len(tournament.lobbies)} lobbies in progress\n"
+    for uid, score in sorted(tournament.scores.items(), key=lambda x: -x[1])[:5]:
+        msg += f"<@{uid}>: {score} pts\n"
+    await interaction.response.send_message(msg, ephemeral=True)
+
+@tournament_group.command(name="cancel", description="Cancel the tournament and end all of its lobbies")
+async def tournament_cancel(interaction: discord.Interaction):
+    tournament = tournaments.get(interaction.guild_id)
+    if not tournament or not tournament.active:
+        await interaction.response.send_message("No tournament is running.", ephemeral=True)
+        return
+    if interaction.user.id != tournament.host_id:
+        await interaction.response.send_message("Only the host can cancel the tournament.", ephemeral=True)
+        return
+    await interaction.response.send_message("The tournament has been cancelled.")
+    await tournament.cancel()
+    if tournaments.get(interaction.guild_id) is tournament:
+        del tournaments[interaction.guild_id]
+
+# Added to the client's command tree by create_bot()
+COMMANDS = (ping, startgame, join, start, answer, vote, scoreboard, spectate, unspectate, endgame, endround,
+            reloadquestions, tournament_group)
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return 0.0  # Not available on Windows
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
 async def on_ready():
-    print(f"Logged in as {bot.user} (ID: {bot.user.id})")
-    if ENV == "DEV":
-        synced = await tree.sync(guild=DEV_GUILD)
-        print(f"[DEV] Synced {len(synced)} commands to guild {DEV_GUILD_ID}")
+    global ready_once
+    if ready_once:
+        print(f"Reconnected as {bot.user}; skipping startup work")
+        metrics.incr("gateway.reconnects")
+        return
+    ready_once = True
+    ready_after = time.perf_counter() - STARTED_AT
+    rss_mb = peak_rss_mb()
+    print(f"Logged in as {bot.user} (ID: {bot.user.id}) after {ready_after:.2f}s, "
+          f"peak RSS {rss_mb:.0f} MB (low-memory members: {'on' if member_cache.LOW_MEMORY_MEMBERS else 'off'})")
+    metrics.set_gauge("startup.ready_seconds", round(ready_after, 3))
+    metrics.set_gauge("startup.peak_rss_mb", round(rss_mb, 1))
+
+    # Games and background loops first: this branch never runs again, so a failed sync must not skip them
+    await resume_checkpointed_games()
+    spawn(reaper.run())
+    spawn(game_history.exporter.run())
+
+    sync_started = time.perf_counter()
+    guild = DEV_GUILD if ENV == "DEV" else None
+    scope = f"to guild {DEV_GUILD_ID}" if guild else "globally"
+    try:
+        synced = await command_sync.sync_if_changed(bot.tree, bot.application_id, guild=guild, force=FORCE_COMMAND_SYNC)
+    except (discord.HTTPException, OSError) as e:
+        # The cache isn't updated, so the next start tries again; commands from the last sync keep working meanwhile
+        print(f"[{ENV}] Command sync {scope} failed: {e}")
+        metrics.incr("command_sync.failed")
+        return
+    if synced is None:
+        print(f"[{ENV}] Commands unchanged, skipped sync {scope}")
     else:
-        synced = await tree.sync()
-        print(f"[PROD] Synced {len(synced)} global commands")
+        print(f"[{ENV}] Synced {len(synced)} commands {scope} in {time.perf_counter() - sync_started:.2f}s")
 
-@bot.event
-async def on_member_remove(member):
-    """Handle when a member leaves the server during a game"""
-    guild_id = member.guild.id
-    if guild_id not in games:
+def save_checkpoint(entries):
+    tmp = f"{CHECKPOINT_PATH}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entries, f)
+    os.replace(tmp, CHECKPOINT_PATH)
+
+async def resume_checkpointed_games():
+    """Take over games handed off by the previous process, if it left a checkpoint"""
+    try:
+        with open(CHECKPOINT_PATH, encoding="utf-8") as f:
+            entries = json.load(f)
+    except FileNotFoundError:
         return
-    
-    game = games[guild_id]
-    if not game.active:
+    except ValueError as e:
+        print(f"Ignoring unreadable checkpoint {CHECKPOINT_PATH}: {e}")
+        entries = []
+    # Consume the checkpoint so a later reconnect or restart doesn't resume the same games twice
+    os.remove(CHECKPOINT_PATH)
+
+    resumed = 0
+    for entry in entries:
+        if entry["guild_id"] in games:
+            continue
+        game = await GameManager.from_checkpoint(bot, entry)
+        if not game:
+            continue
+        register_game(entry["guild_id"], game)
+        spawn(game.resume())
+        resumed += 1
+    print(f"Resumed {resumed}/{len(entries)} checkpointed games")
+
+async def graceful_shutdown():
+    """Stop taking new games, let running rounds finish, checkpoint the rest and disconnect"""
+    global draining
+    if draining:
         return
-    
-    # Check if the leaving member was in the game
-    if any(p.id == member.id for p in game.players):
-        await game.remove_player(member)
-        await game.channel.send(f"⚠️ {member.mention} left the server and was removed from the game.")
-        
-        # End game if not enough players
-        if len(game.players) < 3 and game.current_round > 0:
-            await game.force_end()
-            if guild_id in games:
-                del games[guild_id]
+    draining = True
+    print(f"Shutdown requested, draining {len(games)} games (up to {DRAIN_TIMEOUT}s)...")
+
+    # Tournament brackets span many lobbies and are not handed off
+    for tournament in list(tournaments.values()):
+        await outbound.send(tournament.channel, "⚠️ The bot is restarting, so this tournament has been cancelled.")
+        await tournament.cancel()
+    tournaments.clear()
+
+    for game in games.values():
+        game.draining = True
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + DRAIN_TIMEOUT
+    while loop.time() < deadline and any(g.active and g.game_started and not g.suspended for g in games.values()):
+        await asyncio.sleep(1)
+
+    remaining = [g for g in games.values() if g.active]
+    for game in remaining:
+        if game.game_started and not game.suspended:
+            try:
+                await outbound.send(game.channel, "⏸️ The bot is restarting mid-round. This round will be replayed shortly.")
+            except discord.HTTPException:
+                pass
+    save_checkpoint([g.to_checkpoint() for g in remaining])
+    print(f"Checkpointed {len(remaining)} games to {CHECKPOINT_PATH}")
+
+    # Flush whatever spectators still have queued before disconnecting
+    await asyncio.gather(*(g.events.drain(timeout=5) for g in games.values() if g.has_spectators))
+    await outbound.scheduler.drain(timeout=5)
+    await game_history.exporter.flush()
+    await bot.close()
+
+def on_shutdown_signal():
+    """SIGTERM/SIGINT: the first one drains and checkpoints, another one while that runs exits immediately"""
+    if draining:
+        print("Second shutdown signal while draining, exiting without a checkpoint", flush=True)
+        os._exit(1)
+    spawn(graceful_shutdown())
+
+async def on_raw_member_remove(payload):
+    """Handle when a member leaves the server during a game (fires even when the member isn't cached)"""
+    guild_id = payload.guild_id
+    member = payload.user
+    member_cache.cache.discard(guild_id, member.id)
+    tournament = tournaments.get(guild_id)
+    if tournament and not tournament.started:
+        tournament.remove_participant(member.id)
+
+    affected = [g for g in lobby_games.values() if g.guild_id == guild_id]
+    if guild_id in games:
+        affected.append(games[guild_id])
+    for game in affected:
+        if not game.active:
+            continue
+        game.member_left(member.id)
+        # Check if the leaving member was in the game
+        if member.id in game.player_ids:
+            await game.remove_player(member.id)
+            await outbound.send(game.channel, f"⚠️ {member.mention} left the server and was removed from the game.")
+            
+            # End game if not enough players
+            if len(game.player_ids) < 3 and game.current_round > 0:
+                await game.force_end()
+                forget_game(game)
+
+def create_bot():
+    """The client with every slash command and event handler attached"""
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.members = True
+
+    if member_cache.LOW_MEMORY_MEMBERS:
+        # Skip chunking every member of every guild; game participants are cached on demand instead
+        client = commands.Bot(command_prefix="/", intents=intents, tree_cls=ThrottledTree, chunk_guilds_at_startup=False,
+                              member_cache_flags=discord.MemberCacheFlags.none())
+    else:
+        client = commands.Bot(command_prefix="/", intents=intents, tree_cls=ThrottledTree)
+    for command in COMMANDS:
+        client.tree.add_command(command)
+    client.add_listener(on_ready)
+    client.add_listener(on_raw_member_remove)
+    return client
+
+async def main():
+    async with bot:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, on_shutdown_signal)
+            except NotImplementedError:
+                pass  # Signal handlers are not available on Windows event loops
+        await bot.start(TOKEN)
 
 if __name__ == "__main__":
-    bot.run(TOKEN)
+    discord.utils.setup_logging()
+    create_app()
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+# command_sync.py
+#
+# Slash command syncing is a rate-limited API call, so it is skipped whenever
+# the command definitions hash the same as the last successful sync.
+
+import hashlib
+import json
+import os
+
+CACHE_PATH = os.getenv("COMMAND_SYNC_CACHE", ".command_sync_cache.json")
+
+
+def schema_hash(tree, guild=None):
+    """Hash exactly the payload tree.sync() would upload for this scope"""
+    payload = sorted((cmd.to_dict(tree) for cmd in tree.get_commands(guild=guild)), key=lambda c: (c.get("type", 1), c["name"]))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _load_cache(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache, path):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp, path)
+
+
+async def sync_if_changed(tree, application_id, guild=None, force=False, path=None):
+    """Sync the tree when its schema changed since the last sync. Returns the synced commands, or None if skipped"""
+    path = path or CACHE_PATH
+    scope = f"{application_id}:{guild.id if guild else 'global'}"
+    digest = schema_hash(tree, guild)
+    cache = _load_cache(path)
+    if not force and cache.get(scope) == digest:
+        return None
+    synced = await tree.sync(guild=guild)
+    cache[scope] = digest
+    _save_cache(cache, path)
+    return synced
@@ -0,0 +1,117 @@
+# event_bus.py
+#
+# Fan-out of game events to spectator channels. Publishing never awaits: each
+# subscriber has its own bounded queue drained by its own task, so a slow or
+# rate-limited spectator channel only ever delays itself.
+
+import asyncio
+from collections import deque
+
+import discord
+
+import metrics
+import outbound
+
+# What to do when a subscriber's queue is full
+COALESCE = "coalesce"        # replace a queued event of the same kind, otherwise drop the oldest
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+# Event kinds where only the latest one matters
+COALESCE_KINDS = {"scores"}
+
+
+class Subscriber:
+    def __init__(self, channel, maxsize, policy):
+        self.channel = channel
+        self.maxsize = maxsize
+        self.policy = policy
+        self.queue = deque()
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+    def offer(self, kind, content):
+        """Queue an event without blocking, applying the overflow policy"""
+        if kind in COALESCE_KINDS and self.policy == COALESCE:
+            # The newer event supersedes the queued one and takes its place at the back
+            for queued in self.queue:
+                if queued[0] == kind:
+                    self.queue.remove(queued)
+                    metrics.incr("spectator.coalesced")
+                    break
+        if len(self.queue) >= self.maxsize:
+            if self.policy == DROP_NEWEST:
+                metrics.incr("spectator.dropped")
+                return
+            self.queue.popleft()
+            metrics.incr("spectator.dropped")
+        self.queue.append((kind, content))
+        self.wakeup.set()
+
+
+class EventBus:
+    def __init__(self, label):
+        self.label = label
+        self.subscribers = {}  # channel_id: Subscriber
+        self.closed = False
+
+    def subscribe(self, channel, maxsize=20, policy=COALESCE):
+        if channel.id in self.subscribers:
+            return self.subscribers[channel.id]
+        sub = Subscriber(channel, maxsize, policy)
+        sub.task = asyncio.create_task(self._pump(sub))
+        self.subscribers[channel.id] = sub
+        metrics.incr("spectator.subscribed")
+        return sub
+
+    def unsubscribe(self, channel_id):
+        sub = self.subscribers.pop(channel_id, None)
+        if sub and sub.task:
+            sub.task.cancel()
+        return sub is not None
+
+    def publish(self, kind, content):
+        if self.closed:
+            return
+        metrics.incr("spectator.published")
+        for sub in self.subscribers.values():
+            sub.offer(kind, content)
+
+    def close(self):
+        """Stop accepting events; subscribers exit once their queues are flushed"""
+        self.closed = True
+        for sub in self.subscribers.values():
+            sub.wakeup.set()
+
+    async def drain(self, timeout):
+        """Close the bus and give subscribers up to `timeout` seconds to flush what is queued"""
+        self.close()
+        tasks = [sub.task for sub in self.subscribers.values() if sub.task]
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+    async def _pump(self, sub):
+        while True:
+            if not sub.queue:
+                if self.closed:
+                    break
+                sub.wakeup.clear()
+                await sub.wakeup.wait()
+                continue
+            _, content = sub.queue.popleft()
+            try:
+                await outbound.send(
+                    sub.channel,
+                    f"📺 **{self.label}**\n{content}",
+                    outbound.LOW,
+                    allowed_mentions=discord.AllowedMentions.none(),
+                )
+                metrics.incr("spectator.sent")
+            except (discord.Forbidden, discord.NotFound):
+                # Channel is gone or we lost access; stop mirroring to it
+                metrics.incr("spectator.failed")
+                break
+            except discord.HTTPException:
+                metrics.incr("spectator.failed")
+        if self.subscribers.get(sub.channel.id) is sub:
+            del self.subscribers[sub.channel.id]
@@ -0,0 +1,172 @@
+# game_history.py
+#
+# Completed rounds are exported as JSON lines to gzip files that roll over every
+# day (UTC) and whenever a file grows past HISTORY_MAX_BYTES. Records are
+# buffered in memory and written in batches from a worker thread, so the event
+# loop only ever appends to a list. Each batch is appended as its own gzip
+# member; gzip readers see the members of a file as one continuous stream.
+#
+# The query CLI reads the files in a single streaming pass, keeping only a few
+# counters per day, so memory stays flat however much history there is.
+#
+#   python game_history.py                               # rounds per day, average players, imposter win rate
+#   python game_history.py --since 2026-10-01 --guild 1234
+
+import argparse
+import asyncio
+import glob
+import gzip
+import json
+import os
+import time
+import zlib
+
+import metrics
+
+HISTORY_DIR = os.getenv("HISTORY_DIR", "history")  # Empty to turn the export off
+HISTORY_BATCH = int(os.getenv("HISTORY_BATCH", "200"))  # Rounds buffered before a write is started early
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "30"))
+HISTORY_MAX_BYTES = int(os.getenv("HISTORY_MAX_BYTES", str(64 * 1024 * 1024)))
+MAX_PENDING = 20000  # Rounds kept while the disk is failing before the oldest are dropped
+
+IMPOSTER_WINS = ("escaped", "tie", "no_votes")
+
+
+def day_of(ts):
+    return time.strftime("%Y-%m-%d", time.gmtime(ts))
+
+
+def file_name(day, part):
+    return f"rounds-{day}.jsonl.gz" if part == 0 else f"rounds-{day}.{part}.jsonl.gz"
+
+
+class HistoryExporter:
+    def __init__(self, directory=HISTORY_DIR, batch_size=HISTORY_BATCH, interval=HISTORY_FLUSH_INTERVAL, max_bytes=HISTORY_MAX_BYTES):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self._pending = []
+        self._writer = None
+        self._parts = {}  # day: part number currently appended to
+
+    def record(self, **fields):
+        """Queue one completed round; `ts` defaults to now"""
+        if not self.directory:
+            return
+        fields.setdefault("ts", int(time.time()))
+        self._pending.append(fields)
+        if len(self._pending) > MAX_PENDING:
+            del self._pending[0]
+            metrics.incr("history.dropped")
+        if len(self._pending) % self.batch_size == 0:
+            self._start_writer()  # After a failed write this retries once per further batch, not on every round
+
+    def _start_writer(self):
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_pending())
+        return self._writer
+
+    async def _write_pending(self):
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except OSError as e:
+                print(f"Failed to export {len(batch)} rounds of history: {e}")
+                # Put them back for the next attempt, ahead of anything recorded meanwhile
+                self._pending[:0] = batch[-MAX_PENDING:]
+                return
+            metrics.incr("history.exported", len(batch))
+
+    def _write(self, batch):
+        """Worker thread: serialise, compress and append a batch, one gzip member per file touched"""
+        by_day = {}
+        for fields in batch:
+            by_day.setdefault(day_of(fields["ts"]), []).append(json.dumps(fields, ensure_ascii=False, separators=(",", ":")))
+        os.makedirs(self.directory, exist_ok=True)
+        for day, lines in by_day.items():
+            with gzip.open(self._path_for(day), "ab", compresslevel=6) as f:
+                f.write(("\n".join(lines) + "\n").encode("utf-8"))
+
+    def _path_for(self, day):
+        part = self._parts.get(day, 0)
+        path = os.path.join(self.directory, file_name(day, part))
+        while os.path.exists(path) and os.path.getsize(path) >= self.max_bytes:
+            part += 1
+            path = os.path.join(self.directory, file_name(day, part))
+        self._parts[day] = part
+        return path
+
+    async def flush(self):
+        """Write everything recorded so far"""
+        while self._pending or (self._writer and not self._writer.done()):
+            await self._start_writer()
+            if self._pending and self._writer.done():
+                return  # The write failed; try again on the next flush
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+
+exporter = HistoryExporter()
+
+
+def iter_rounds(directory=None, since=None, until=None):
+    """Stream exported round records, oldest day first; `since`/`until` are inclusive YYYY-MM-DD days"""
+    directory = directory or HISTORY_DIR
+    for path in sorted(glob.glob(os.path.join(directory, "rounds-*.jsonl.gz"))):
+        day = os.path.basename(path)[len("rounds-"):len("rounds-") + 10]
+        if (since and day < since) or (until and day > until):
+            continue
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    yield json.loads(line)
+        except (EOFError, gzip.BadGzipFile, zlib.error, ValueError) as e:
+            # A batch cut off by a crash only loses the rest of that file
+            print(f"Skipping the rest of {path}: {e}")
+
+
+def summarise(records, guild=None):
+    """Fold round records into day: [rounds, players, imposter wins]"""
+    days = {}
+    for record in records:
+        if guild is not None and record["guild"] != guild:
+            continue
+        day = day_of(record["ts"])
+        row = days.get(day)
+        if row is None:
+            row = days[day] = [0, 0, 0]
+        row[0] += 1
+        row[1] += record["players"]
+        if record["outcome"] in IMPOSTER_WINS:
+            row[2] += 1
+    return days
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate exported round history")
+    parser.add_argument("--dir", default=HISTORY_DIR, help="History directory to read")
+    parser.add_argument("--since", help="First day to include (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Last day to include (YYYY-MM-DD)")
+    parser.add_argument("--guild", type=int, help="Only rounds played in this server")
+    args = parser.parse_args()
+
+    days = summarise(iter_rounds(args.dir, args.since, args.until), args.guild)
+    if not days:
+        print(f"No rounds found in {args.dir}")
+        return
+    print(f"{'day':10} | {'rounds':>7} | {'avg players':>11} | {'imposter wins':>13}")
+    for day in sorted(days):
+        rounds, players, wins = days[day]
+        print(f"{day:10} | {rounds:7d} | {players / rounds:11.1f} | {wins / rounds:13.0%}")
+    rounds, players, wins = (sum(row[i] for row in days.values()) for i in range(3))
+    print(f"{'total':10} | {rounds:7d} | {players / rounds:11.1f} | {wins / rounds:13.0%} "
+          f"({rounds / len(days):.1f} rounds per day over {len(days)} days)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# game_log.py
+#
+# Append-only event stream for a single game: joins, question assignments,
+# answers, votes, removals and scores, one JSON object per line. Together with
+# the seed of the game's RNG this is enough to re-run the game exactly (see
+# benchmarks/replay.py). Events are buffered in memory and appended to the
+# game's file at round boundaries; with no log directory they simply stay in
+# memory.
+
+import json
+import os
+import time
+
+LOG_DIR = os.getenv("GAME_LOG_DIR", "game_logs")  # Empty to keep events in memory only
+
+
+class GameLog:
+    __slots__ = ("game_id", "path", "events", "_seq", "_started")
+
+    def __init__(self, game_id, directory=None):
+        directory = LOG_DIR if directory is None else directory
+        self.game_id = game_id
+        self.path = os.path.join(directory, f"{game_id}.jsonl") if directory else None
+        self.events = []  # Not yet written to disk
+        self._seq = 0
+        self._started = time.monotonic()
+
+    def emit(self, kind, **data):
+        self._seq += 1
+        self.events.append({"seq": self._seq, "t": round(time.monotonic() - self._started, 3), "kind": kind, **data})
+
+    def flush(self):
+        """Append buffered events to the game's file"""
+        if not self.path or not self.events:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(event, ensure_ascii=False) + "\n" for event in self.events)
+        except OSError as e:
+            print(f"Failed to write game log {self.path}: {e}")
+            return
+        self.events.clear()
+
+
+def read(path):
+    """Events of a recorded game, in order"""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -2,51 +2,126 @@
 
 import random
 import asyncio
-import discord
-from questions_custom import QUESTION_PAIRS 
+import time
+from array import array
+import question_bank
+import question_stats
+import member_cache
+import moderation
+import game_log
+import game_history
+import outbound
+from outbound import CRITICAL, NORMAL, LOW
+from game_reaper import reaper
+from event_bus import EventBus
+from status_message import LiveStatus
 
-def validate_questions():
-    """Validate that all question pairs are properly formatted"""
-    for i, pair in enumerate(QUESTION_PAIRS):
-        if not isinstance(pair, dict) or 'normal' not in pair or 'imposter' not in pair:
-            raise ValueError(f"Invalid question pair at index {i}: {pair}")
-        if not pair['normal'] or not pair['imposter']:
-            raise ValueError(f"Empty question found at index {i}")
-    return True
+def mention(user_id):
+    """Render a mention from a bare id, without needing the Member object"""
+    return f"<@{user_id}>"
 
-# Validate questions on import
-validate_questions()
+async def pause(seconds):
+    """Dramatic pause between reveals; replays swap this out to run at full speed"""
+    await asyncio.sleep(seconds)
 
 class GameManager:
-    def __init__(self, guild, host, rounds, timer, anonymous, no_vote_timer=False):
-        self.guild = guild
-        self.host = host
+    # Game state only holds ids; guild, channel and members are looked up through
+    # the client when a message is rendered, so an ended game pins nothing.
+    __slots__ = (
+        "_client", "guild_id", "host_id", "channel_id", "rounds_total", "timer", "no_vote_timer", "spectators",
+        "player_ids", "active", "game_started", "current_round", "imposter_id",
+        "bank", "common_question", "imposter_question", "question_pair", "answers", "votes", "scores",
+        "voting_open", "votes_done_event", "vote_deadline", "status", "draining", "suspended", "host_present", "_events", "_cleanup_callback",
+        "rng", "log",
+    )
+
+    def __init__(self, client, guild_id, host_id, rounds, timer, anonymous, no_vote_timer=False, spectators=False, seed=None):
+        self._client = client
+        self.guild_id = guild_id
+        self.host_id = host_id
+        self.host_present = True  # Cleared by member_left; players who leave are removed outright
         self.rounds_total = rounds
         self.timer = timer
         self.no_vote_timer = no_vote_timer
-        self.players = []
+        self.spectators = spectators  # Whether channels in other servers may /spectate; the host opts in
+        self.player_ids = array("Q")  # Join order
         self.active = True
         self.game_started = False  # Track if /start was called
         self.current_round = 0
-        self.imposter = None
+        self.imposter_id = None
         self.common_question = None
         self.imposter_question = None
-        self.answers = {}
-        self.votes = {}
+        self.question_pair = None
+        self.bank = question_bank.current()  # Kept for the whole game, even if the bank is reloaded meanwhile
+        self.answers = {}  # user_id: answer text
+        self.votes = {}  # voter_id: target_id
         self.scores = {}  # user_id: points
         self.voting_open = False
         self.votes_done_event = None
-        self.channel = None
+        self.vote_deadline = None  # Unix time the voting timer runs out
+        self.status = None  # Live progress message for the current phase
+        self.draining = False  # Set on shutdown: pause at the next round boundary instead of continuing
+        self.suspended = False  # Paused at a round boundary, waiting to be checkpointed
+        self.channel_id = None
+        self._events = None  # Created when the first spectator subscribes
         self._cleanup_callback = None  # Initialize cleanup callback
+        # Every random pick comes from this seeded RNG, so a game log can be replayed exactly
+        seed = random.getrandbits(64) if seed is None else seed
+        self.rng = random.Random(seed)
+        self.log = game_log.GameLog(f"{guild_id}-{seed:016x}")
+        self.log.emit("start", seed=seed, guild=guild_id, host=host_id, rounds=rounds, timer=timer,
+                      no_vote_timer=no_vote_timer, bank_version=self.bank.version, bank_size=len(self.bank))
+
+    @property
+    def events(self):
+        """Bus mirroring reveals, results and scores to spectators"""
+        if self._events is None:
+            guild = self.guild
+            self._events = EventBus(guild.name if guild else str(self.guild_id))
+        return self._events
+
+    @property
+    def has_spectators(self):
+        return self._events is not None and bool(self._events.subscribers)
+
+    @property
+    def guild(self):
+        return self._client.get_guild(self.guild_id)
+
+    @property
+    def channel(self):
+        guild = self.guild
+        if guild is None or self.channel_id is None:
+            return None
+        return guild.get_channel_or_thread(self.channel_id)
+
+    @channel.setter
+    def channel(self, channel):
+        self.channel_id = channel.id if channel else None
+
+    async def _resolve_member(self, user_id):
+        """Member object for sending DMs or showing names; None if they are gone"""
+        guild = self.guild
+        if guild is None:
+            return None
+        return await member_cache.cache.fetch(guild, user_id)
+
+    def member_left(self, user_id):
+        """Track server departures ourselves instead of scanning guild.members"""
+        if user_id == self.host_id:
+            self.host_present = False
 
     async def start_lobby(self, interaction):
         self.channel = interaction.channel
+        reaper.touch(self)
         timer_info = f"Timer: {self.timer}s" if not self.no_vote_timer else "No timer (unlimited voting time)"
         await interaction.response.send_message(
             f"A new game of **Guess the Imposter** has started!\n"
             f"Type `/join` to participate.\n"
             f"Rounds: {self.rounds_total} | {timer_info}\n"
-            f"The host must run `/start` to begin once enough players join."
+            f"The host must run `/start` to begin once enough players join.\n"
+            + (f"Channels in any server can follow along with `/spectate {self.guild_id}`." if self.spectators
+               else "Other channels in this server can follow along with `/spectate`.")
         )
 
     async def add_player(self, interaction):
@@ -57,19 +132,18 @@ class GameManager:
             if self.game_started or self.current_round > 0:
                 await interaction.response.send_message("You can't join after the game has started.", ephemeral=True)
                 return
-            if any(p.id == interaction.user.id for p in self.players):
+            if interaction.user.id in self.player_ids:
                 await interaction.response.send_message("You've already joined the game.", ephemeral=True)
                 return
-            # Check if user is still in the guild
-            if not discord.utils.get(self.guild.members, id=interaction.user.id):
-                await interaction.response.send_message("You must be a member of the server to join.", ephemeral=True)
-                return
             # Check if bot can DM the user by sending a test message
             try:
-                await interaction.user.send("✅ Test successful - you can receive DMs! You can safely ignore this message.")
+                await outbound.send(interaction.user, "✅ Test successful - you can receive DMs! You can safely ignore this message.", CRITICAL)
                 # If DM succeeds, add player and respond
-                self.players.append(interaction.user)
-                await interaction.response.send_message(f"{interaction.user.mention} joined the game! ({len(self.players)} players)")
+                self.player_ids.append(interaction.user.id)
+                member_cache.cache.put(interaction.user)
+                reaper.touch(self)
+                self.log.emit("join", user=interaction.user.id)
+                await interaction.response.send_message(f"{interaction.user.mention} joined the game! ({len(self.player_ids)} players)")
             except Exception:
                 await interaction.response.send_message("I can't DM you. Please enable DMs from server members to join.", ephemeral=True)
                 return
@@ -81,197 +155,244 @@ class GameManager:
                 pass
             return
 
-    async def remove_player(self, user):
+    async def remove_player(self, user_id):
         """Remove a player and clean up their data"""
-        self.players = [p for p in self.players if p.id != user.id]
+        if user_id in self.player_ids:
+            self.player_ids.remove(user_id)
+            self.log.emit("remove", user=user_id, reason="removed")
         
         # Clean up answers and votes
-        if user in self.answers:
-            del self.answers[user]
-        if user in self.votes:
-            del self.votes[user]
+        self.answers.pop(user_id, None)
+        self.votes.pop(user_id, None)
         
         # Remove votes for this user
         for voter in list(self.votes.keys()):
-            if self.votes[voter].id == user.id:
+            if self.votes[voter] == user_id:
                 del self.votes[voter]
         
         # Handle imposter leaving during a round
-        if self.imposter and self.imposter.id == user.id and self.current_round > 0:
+        if self.imposter_id == user_id and self.current_round > 0:
             # If imposter leaves during active round, end the round
             if self.channel:
-                await self.channel.send(f"⚠️ The imposter ({user.mention}) has left the game! Round ends automatically.")
-                await self.channel.send(f"❓ The imposter's question was: \"{self.imposter_question}\"")
+                await self._send(f"⚠️ The imposter ({mention(user_id)}) has left the game! Round ends automatically.", CRITICAL)
+                await self._send(f"❓ The imposter's question was: \"{self.imposter_question}\"", CRITICAL)
             # Close voting if it's open
             if self.voting_open:
                 self.voting_open = False
                 if self.votes_done_event:
                     self.votes_done_event.set()
+        self._refresh_status()
         # If not enough players after removal
-        if len(self.players) < 3:
+        if len(self.player_ids) < 3:
             await self.end_game_with_results("Not enough players to continue (player left).")
 
     async def begin_game(self, interaction):
         # Check if host left server
-        if not discord.utils.get(self.guild.members, id=self.host.id):
+        if not self.host_present:
             await interaction.response.send_message("The host has left the server. Game ended.", ephemeral=True)
             self.active = False
             return
             
-        if interaction.user != self.host:
+        if interaction.user.id != self.host_id:
             await interaction.response.send_message("Only the host can start the game.", ephemeral=True)
             return
-        if len(self.players) < 3:
+        if len(self.player_ids) < 3:
             await interaction.response.send_message("At least 3 players are required to start.", ephemeral=True)
             return
         if self.game_started:
             await interaction.response.send_message("The game has already been started.", ephemeral=True)
             return
-            
-        # Prevent starting if any player is no longer in the server
-        removed = []
-        for player in list(self.players):
-            if not discord.utils.get(self.guild.members, id=player.id):
-                removed.append(player)
-                self.players.remove(player)
-        if removed:
-            await self.channel.send(", ".join(p.mention for p in removed) + " left the server and were removed from the game.")
-        if len(self.players) < 3:
-            await interaction.response.send_message("Not enough players to start after removing absent members.", ephemeral=True)
-            return
         
         self.game_started = True
+        self.log.emit("begin", players=list(self.player_ids))
         await interaction.response.send_message("Starting game...")
         await self.next_round()
 
+    async def begin_with_players(self, channel, player_ids):
+        """Skip the lobby and start round 1 with a fixed roster (used for tournament lobbies)"""
+        self.channel = channel
+        self.player_ids = array("Q", player_ids)
+        self.game_started = True
+        self.log.emit("begin", players=list(self.player_ids))
+        await self.next_round()
+
     async def next_round(self):
         self.current_round += 1
+        reaper.touch(self)
         self.answers.clear()
         self.votes.clear()
         # Check if we have questions available
-        if not QUESTION_PAIRS:
+        if not self.bank:
             await self.end_game_with_results("No questions available.")
             return
-        # Remove players who left the server
-        removed = []
-        for player in list(self.players):
-            if not discord.utils.get(self.guild.members, id=player.id):
-                removed.append(player)
-                self.players.remove(player)
-        if removed:
-            await self.channel.send(", ".join(p.mention for p in removed) + " left the server and were removed from the game.")
-        if not self.players or len(self.players) < 3:
+        # Players who left the server were already removed by member events
+        if not self.player_ids or len(self.player_ids) < 3:
             await self.end_game_with_results("Not enough players to continue.")
             return
 
-        self.imposter = random.choice(self.players)
-        q_pair = random.choice(QUESTION_PAIRS)
+        self.imposter_id = self.rng.choice(self.player_ids)
+        q_pair = self.bank.choose(self.rng)
+        self.question_pair = q_pair
         self.common_question, self.imposter_question = q_pair["normal"], q_pair["imposter"]
+        self.log.emit("round", round=self.current_round, imposter=self.imposter_id,
+                      normal=self.common_question, imposter_question=self.imposter_question)
 
         # Send questions via DM
         failed_dms = []
-        for player in self.players:
+        for uid in self.player_ids:
             try:
-                question = self.imposter_question if player.id == self.imposter.id else self.common_question
-                await player.send(
+                question = self.imposter_question if uid == self.imposter_id else self.common_question
+                player = await self._resolve_member(uid)
+                if player is None:
+                    raise LookupError(uid)
+                await outbound.send(
+                    player,
                     f"**Round {self.current_round}/{self.rounds_total}**\n\n"
                     f"❓ **{question}**\n\n"
-                    f"Reply with `/answer [your answer]` in the server channel."
+                    f"Reply with `/answer [your answer]` in the server channel.",
+                    CRITICAL,
                 )
             except Exception:
-                failed_dms.append(player)
+                failed_dms.append(uid)
                 
         # Remove players who couldn't be DM'd
-        for player in failed_dms:
-            self.players.remove(player)
-            await self.channel.send(f"{player.mention} could not be DM'd and was removed from the game.")
-        if len(self.players) < 3:
+        for uid in failed_dms:
+            self.player_ids.remove(uid)
+            self.log.emit("remove", user=uid, reason="dm_failed")
+            await self._send(f"{mention(uid)} could not be DM'd and was removed from the game.")
+        if len(self.player_ids) < 3:
             await self.end_game_with_results("Not enough players to continue (DM failure).")
             return
 
-        await self.channel.send(
+        self.status = LiveStatus(self.channel)
+        await self.status.start(self._answer_status())
+
+    def _answer_status(self, done=False):
+        progress = "✅ All answers are in!" if done else f"✍️ {len(self.answers)}/{len(self.player_ids)} answers in"
+        return (
             f"**Round {self.current_round}/{self.rounds_total}** has started!\n"
             f"Everyone, answer your question using `/answer [your answer]`.\n"
             f"Please **don't reveal your question**!\n\n"
-            f"Waiting for {len(self.players)} players to submit answers..."
+            f"{progress}"
         )
 
+    def _vote_status(self, closed=None):
+        progress = f"🗳️ {len(self.votes)}/{len(self.player_ids)} voted"
+        if closed:
+            return f"{closed} {progress}"
+        if self.no_vote_timer:
+            return (
+                f"No timer for voting. Discuss and vote for who you think is the imposter using `/vote @player`.\n"
+                f"The round will continue until all votes are in.\n\n{progress}"
+            )
+        return (
+            f"You have {self.timer} seconds to discuss and find the imposter! Voting is open during this time. Use `/vote @player`.\n\n"
+            f"⏳ Voting closes <t:{int(self.vote_deadline)}:R> | {progress}"
+        )
+
+    def _refresh_status(self):
+        """Queue a throttled edit of the live status for the current phase"""
+        if self.status is None:
+            return
+        self.status.update(self._vote_status() if self.voting_open else self._answer_status())
+
     async def submit_answer(self, interaction, text):
         if not self.active or self.current_round == 0:
             await interaction.response.send_message("No round is currently active.", ephemeral=True)
             return
-        if not any(p.id == interaction.user.id for p in self.players):
+        user_id = interaction.user.id
+        if user_id not in self.player_ids:
             await interaction.response.send_message("You're not part of this game.", ephemeral=True)
             return
-        if interaction.user in self.answers:
+        if user_id in self.answers:
             await interaction.response.send_message("You've already submitted an answer.", ephemeral=True)
             return
-          # Check if user still in server
-        if not discord.utils.get(self.guild.members, id=interaction.user.id):
-            await interaction.response.send_message("You are no longer in the server.", ephemeral=True)
-            return
             
-        self.answers[interaction.user] = text
+        self.answers[user_id] = text
+        reaper.touch(self)
+        self.log.emit("answer", user=user_id, text=text)
         
         # Remove answers from players who left
-        for user in list(self.answers.keys()):
-            if not any(p.id == user.id for p in self.players):
-                del self.answers[user]
+        present = set(self.player_ids)
+        for uid in list(self.answers.keys()):
+            if uid not in present:
+                del self.answers[uid]
           # Re-check if user is still in players list after cleanup
-        if not any(p.id == interaction.user.id for p in self.players):
+        if user_id not in self.player_ids:
             await interaction.response.send_message("You are no longer in the game.", ephemeral=True)
             return
             
         await interaction.response.send_message("Answer submitted!", ephemeral=True)
                 
         # Check if all answers are in
-        if len(self.answers) == len(self.players):
+        if len(self.answers) == len(self.player_ids):
             await self.reveal_answers()
+        else:
+            self._refresh_status()
 
     async def reveal_answers(self):
+        if self.status:
+            await self.status.finish(self._answer_status(done=True))
+            self.status = None
         if not self.answers:
-            await self.channel.send("No answers to reveal. Moving to next round.")
+            await self._send("No answers to reveal. Moving to next round.", CRITICAL)
             return
         
+        # The whole round is checked in one batch before anything is posted
+        flagged = await moderation.flag_answers(self.answers)
+        if flagged:
+            self.log.emit("moderated", round=self.current_round, users=list(flagged))
         msg = "\n📝 **All answers:**\n"
-        for user, answer in self.answers.items():
-            msg += f"• {user.mention}: {answer}\n"
-        await self.channel.send(msg)
+        for uid, answer in self.answers.items():
+            if uid in flagged:
+                answer = "*(hidden by the moderation filter)*"
+            msg += f"• {mention(uid)}: {answer}\n"
+        await self._announce("answers", msg)
         await self.reveal_question()
 
     async def reveal_question(self):
-        await self.channel.send(f"\n🧠 **Everyone's question:** {self.common_question}")
+        await self._announce("question", f"\n🧠 **Everyone's question:** {self.common_question}")
         
-        voting_msg = f"\nYou have {self.timer} seconds to discuss and find the imposter! Voting is open during this time. Use `/vote @player`."
-        if self.no_vote_timer:
-            voting_msg = "\nNo timer for voting. Discuss and vote for who you think is the imposter using `/vote @player`."
-        
-        await self.channel.send(voting_msg)
+        # One status message carries the countdown and vote progress instead of repeated reminders.
+        # The countdown is a Discord relative timestamp that ticks client-side, so only votes trigger
+        # edits, and no more often than the old reminders were posted.
+        reminder_interval = 15 if self.timer > 30 else max(5, self.timer // 3)
+        self.vote_deadline = time.time() + self.timer
         self.voting_open = True
         self.votes_done_event = asyncio.Event()
+        reaper.touch(self)
+        self.status = LiveStatus(self.channel, min_interval=reminder_interval)
+        self.log.emit("voting", round=self.current_round)
+        await self.status.start(self._vote_status())
         
+        cause = "closed"  # All votes in, or ended by /endround
         if self.no_vote_timer:
-            await self.channel.send("The round will continue until all votes are in.")
-            while self.voting_open:
-                await asyncio.sleep(2)
-                if len(self.votes) == len(self.players):
+            while self.voting_open and self.active:
+                try:
+                    await asyncio.wait_for(self.votes_done_event.wait(), timeout=2)
+                except asyncio.TimeoutError:
+                    pass
+                if len(self.votes) == len(self.player_ids):
                     self.voting_open = False
                     if self.votes_done_event:
                         self.votes_done_event.set()
+            closed = "🔒 **All votes are in!**"
         else:
-            reminder_interval = 15 if self.timer > 30 else max(5, self.timer // 3)
-            time_left = self.timer
-            while time_left > 0 and self.voting_open:
+            closed = "⌛ **Time's up! Voting is now closed.**"
+            if self.voting_open:
                 try:
-                    await asyncio.wait_for(self.votes_done_event.wait(), timeout=min(reminder_interval, time_left))
+                    await asyncio.wait_for(self.votes_done_event.wait(), timeout=self.timer)
                     # If event is set, all votes are in
-                    break
+                    closed = "🔒 **Voting is now closed.**"
                 except asyncio.TimeoutError:
-                    time_left -= reminder_interval
-                    if time_left > 0 and self.voting_open:
-                        await self.channel.send(f"⏳ {time_left} seconds left! Time is running out, please vote using `/vote @player`.")
+                    cause = "timeout"
             self.voting_open = False
-            await self.channel.send("Time's up! Voting is now closed.")
+        self.log.emit("voting_closed", round=self.current_round, cause=cause)
+        if not self.active:
+            return  # Ended while voting (force ended or reaped); results were already announced
+        if self.status:
+            await self.status.finish(self._vote_status(closed=closed))
+            self.status = None
         await self.reveal_results()
 
     async def submit_vote(self, interaction, target):
@@ -279,33 +400,30 @@ class GameManager:
         if not self.voting_open or not self.active:
             await interaction.response.send_message("Voting is currently closed. You can only vote during the discussion period.", ephemeral=True)
             return
-        if not any(p.id == interaction.user.id for p in self.players) or not any(p.id == target.id for p in self.players):
+        voter_id = interaction.user.id
+        if voter_id not in self.player_ids or target.id not in self.player_ids:
             await interaction.response.send_message("Invalid vote.", ephemeral=True)
             return
-        if interaction.user in self.votes:
+        if voter_id in self.votes:
             await interaction.response.send_message("You already voted.", ephemeral=True)
             return
-        if interaction.user.id == target.id:
+        if voter_id == target.id:
             await interaction.response.send_message("You cannot vote for yourself!", ephemeral=True)
             return
-        
-        # Check if both users still in server
-        if not discord.utils.get(self.guild.members, id=interaction.user.id):
-            await interaction.response.send_message("You are no longer in the server.", ephemeral=True)
-            return
-        if not discord.utils.get(self.guild.members, id=target.id):
-            await interaction.response.send_message("That user is no longer in the server.", ephemeral=True)
-            return
             
-        self.votes[interaction.user] = target
+        self.votes[voter_id] = target.id
+        reaper.touch(self)
+        self.log.emit("vote", user=voter_id, target=target.id)
         await interaction.response.send_message(f"Vote for {target.display_name} received!", ephemeral=True)
         
         # Remove votes from players who left
-        for user in list(self.votes.keys()):
-            if not any(p.id == user.id for p in self.players):
-                del self.votes[user]
+        present = set(self.player_ids)
+        for uid in list(self.votes.keys()):
+            if uid not in present:
+                del self.votes[uid]
+        self._refresh_status()
                   # Check if all votes are in (with race condition protection)
-        if len(self.votes) == len(self.players) and self.voting_open:
+        if len(self.votes) == len(self.player_ids) and self.voting_open:
             self.voting_open = False
             if self.votes_done_event:
                 self.votes_done_event.set()
@@ -313,15 +431,16 @@ class GameManager:
     async def reveal_results(self):
         try:
             if not self.votes:
-                await self.channel.send("No votes were cast. The imposter escapes!")
-                if self.imposter and any(p.id == self.imposter.id for p in self.players):
-                    await self.channel.send(f"❗ The imposter was {self.imposter.mention}!")
+                await self._announce("results", "No votes were cast. The imposter escapes!")
+                if self.imposter_id and self.imposter_id in self.player_ids:
+                    await self._announce("results", f"❗ The imposter was {mention(self.imposter_id)}!")
                     if self.imposter_question:
-                        await self.channel.send(f"❓ Their question was: \"{self.imposter_question}\"")
-                    self.scores[self.imposter.id] = self.scores.get(self.imposter.id, 0) + 2
-                elif self.imposter:
-                    await self.channel.send("❗ The imposter left the game!")
-                await asyncio.sleep(2)
+                        await self._announce("results", f"❓ Their question was: \"{self.imposter_question}\"")
+                    self.scores[self.imposter_id] = self.scores.get(self.imposter_id, 0) + 2
+                    self._record_outcome(question_stats.NO_VOTES)
+                elif self.imposter_id:
+                    await self._announce("results", "❗ The imposter left the game!")
+                await pause(2)
                 await self.continue_game()
                 return
             
@@ -334,59 +453,87 @@ class GameManager:
             top_voted = [user for user, count in vote_counts.items() if count == max_votes]
             
             if len(top_voted) > 1:
-                await self.channel.send("It's a tie! The imposter escapes by default.")
-                if self.imposter:
-                    await self.channel.send(f"❗ The imposter was {self.imposter.mention}!")
+                await self._announce("results", "It's a tie! The imposter escapes by default.")
+                if self.imposter_id:
+                    await self._announce("results", f"❗ The imposter was {mention(self.imposter_id)}!")
                     if self.imposter_question:
-                        await self.channel.send(f"❓ Their question was: \"{self.imposter_question}\"")
-                    self.scores[self.imposter.id] = self.scores.get(self.imposter.id, 0) + 2
+                        await self._announce("results", f"❓ Their question was: \"{self.imposter_question}\"")
+                    self.scores[self.imposter_id] = self.scores.get(self.imposter_id, 0) + 2
+                    self._record_outcome(question_stats.TIE)
             else:
                 top_voted = top_voted[0]
-                await self.channel.send(f"❗ **The imposter was {self.imposter.mention}!**")
-                await self.channel.send(f"❓ Their question was: \"{self.imposter_question}\"")
+                await self._announce("results", f"❗ **The imposter was {mention(self.imposter_id)}!**")
+                await self._announce("results", f"❓ Their question was: \"{self.imposter_question}\"")
 
-                if top_voted.id == self.imposter.id:
-                    await self.channel.send("🎯 **The imposter was caught!**")
+                if top_voted == self.imposter_id:
+                    await self._announce("results", "🎯 **The imposter was caught!**")
                     for voter, voted in self.votes.items():
-                        if voted.id == self.imposter.id and voter.id != self.imposter.id:
-                            self.scores[voter.id] = self.scores.get(voter.id, 0) + 1
+                        if voted == self.imposter_id and voter != self.imposter_id:
+                            self.scores[voter] = self.scores.get(voter, 0) + 1
+                    self._record_outcome(question_stats.CAUGHT)
                 else:
-                    await self.channel.send("😈 **The imposter got away!**")
+                    await self._announce("results", "😈 **The imposter got away!**")
                     # Only award points to imposter if they're still in the game
-                    if any(p.id == self.imposter.id for p in self.players):
-                        self.scores[self.imposter.id] = self.scores.get(self.imposter.id, 0) + 2
+                    if self.imposter_id in self.player_ids:
+                        self.scores[self.imposter_id] = self.scores.get(self.imposter_id, 0) + 2
+                    self._record_outcome(question_stats.ESCAPED)
 
-            await asyncio.sleep(2)
+            await pause(2)
             await self.continue_game()
         except Exception as e:
-            await self.channel.send(f"❗ An unexpected error occurred during results: {str(e)}. The game has ended.")
+            await self._send(f"❗ An unexpected error occurred during results: {str(e)}. The game has ended.")
             self.active = False
             await self._cleanup_game()
 
+    def _record_outcome(self, outcome):
+        """Record how this round's question pair played out for the balance statistics"""
+        if not self.question_pair:
+            return
+        votes_for_imposter = sum(1 for voted in self.votes.values() if voted == self.imposter_id)
+        self.log.emit("outcome", round=self.current_round, outcome=question_stats.OUTCOME_NAMES[outcome])
+        game_history.exporter.record(
+            game=self.log.game_id, guild=self.guild_id, round=self.current_round, players=len(self.player_ids),
+            imposter=self.imposter_id, pair=f"{question_stats.pair_key(self.question_pair):016x}",
+            outcome=question_stats.OUTCOME_NAMES[outcome],
+            answers={str(uid): text for uid, text in self.answers.items()},
+            votes={str(voter): voted for voter, voted in self.votes.items()},
+            scores={str(uid): pts for uid, pts in self.scores.items()},
+        )
+        try:
+            question_stats.record_round(self.question_pair, outcome, len(self.player_ids), votes_for_imposter, len(self.votes))
+        except OSError as e:
+            print(f"Failed to record question stats: {e}")
+
     async def continue_game(self):
         try:
+            self.log.emit("scores", round=self.current_round, scores={str(uid): pts for uid, pts in self.scores.items()})
+            self.log.flush()
             # Show scorecard after every round except the last
             if self.current_round < self.rounds_total:
                 msg = "🏅 **Current Scores:**\n"
-                for player in self.players:
-                    score = self.scores.get(player.id, 0)
-                    msg += f"{player.mention}: {score} pts\n"
-                await self.channel.send(msg)
-                await self.channel.send(f"\n--- Starting round {self.current_round + 1} ---")
-                await asyncio.sleep(3)
+                for uid in self.player_ids:
+                    score = self.scores.get(uid, 0)
+                    msg += f"{mention(uid)}: {score} pts\n"
+                await self._announce("scores", msg)
+                if self.draining:
+                    self.suspended = True
+                    await self._send("⏸️ The bot is restarting. The game will continue with the next round shortly.")
+                    return
+                await self._send(f"\n--- Starting round {self.current_round + 1} ---")
+                await pause(3)
                 await self.next_round()
             else:
                 await self.final_scores()
         except Exception as e:
-            await self.channel.send(f"❗ An unexpected error occurred during round progression: {str(e)}. The game has ended.")
+            await self._send(f"❗ An unexpected error occurred during round progression: {str(e)}. The game has ended.")
             self.active = False
             await self._cleanup_game()
 
     async def final_scores(self):
         try:
-            leaderboard = sorted([(player, self.scores.get(player.id, 0)) for player in self.players], key=lambda x: -x[1])
+            leaderboard = sorted([(uid, self.scores.get(uid, 0)) for uid in self.player_ids], key=lambda x: -x[1])
             msg = "\n🏆 **Final Scores:**\n"
-            for i, (player, score) in enumerate(leaderboard):
+            for i, (uid, score) in enumerate(leaderboard):
                 if i == 0:
                     emoji = "🥇"
                 elif i == 1:
@@ -395,30 +542,98 @@ class GameManager:
                     emoji = "🥉"
                 else:
                     emoji = "🏅"
-                msg += f"{emoji} {player.mention} - {score} pts\n"
-            await self.channel.send(msg)
+                msg += f"{emoji} {mention(uid)} - {score} pts\n"
+            await self._announce("final", msg)
             # Announce winner(s) or tie
             if leaderboard and leaderboard[0][1] > 0:
                 top_score = leaderboard[0][1]
-                winners = [player for player, score in leaderboard if score == top_score]
+                winners = [uid for uid, score in leaderboard if score == top_score]
                 if len(winners) == 1:
-                    await self.channel.send(f"🎉 **{winners[0].mention} wins the game!** 🎉")
+                    await self._announce("final", f"🎉 **{mention(winners[0])} wins the game!** 🎉")
                 else:
-                    winner_mentions = ", ".join(w.mention for w in winners)
-                    await self.channel.send(f"🤝 **It's a tie! Winners:** {winner_mentions} with {top_score} pts each!")
+                    winner_mentions = ", ".join(mention(w) for w in winners)
+                    await self._announce("final", f"🤝 **It's a tie! Winners:** {winner_mentions} with {top_score} pts each!")
             self.active = False
+            self.log.emit("end", reason="completed")
             await self._cleanup_game()
         except Exception as e:
-            await self.channel.send(f"❗ An unexpected error occurred during final scores: {str(e)}. The game has ended.")
+            await self._send(f"❗ An unexpected error occurred during final scores: {str(e)}. The game has ended.")
             self.active = False
             await self._cleanup_game()
 
+    def to_checkpoint(self):
+        """Serializable snapshot used to hand the game over to the next bot process"""
+        return {
+            "guild_id": self.guild_id,
+            "channel_id": self.channel_id,
+            "host_id": self.host_id,
+            "rounds_total": self.rounds_total,
+            "timer": self.timer,
+            "no_vote_timer": self.no_vote_timer,
+            "spectators": self.spectators,
+            "player_ids": list(self.player_ids),
+            "scores": {str(uid): score for uid, score in self.scores.items()},
+            "current_round": self.current_round,
+            "game_started": self.game_started,
+            "round_complete": self.suspended,
+        }
+
+    @classmethod
+    async def from_checkpoint(cls, client, data):
+        """Rebuild a checkpointed game, or return None if its server or channel is gone"""
+        game = cls(client, data["guild_id"], data["host_id"], rounds=data["rounds_total"], timer=data["timer"],
+                   anonymous=None, no_vote_timer=data["no_vote_timer"], spectators=data.get("spectators", False))
+        game.channel_id = data["channel_id"]
+        if game.channel is None:
+            return None
+        # Players who left while the bot was down are dropped; a departed host keeps the usual "host left" rules
+        game.host_present = await game._resolve_member(data["host_id"]) is not None
+        for user_id in data["player_ids"]:
+            if await game._resolve_member(user_id):
+                game.player_ids.append(user_id)
+        game.scores = {int(uid): score for uid, score in data["scores"].items()}
+        game.game_started = data["game_started"]
+        # A round interrupted midway is replayed from the start with a fresh question
+        game.current_round = data["current_round"] if data["round_complete"] else max(0, data["current_round"] - 1)
+        game.log.emit("resume", round=game.current_round, started=game.game_started, players=list(game.player_ids),
+                      scores={str(uid): pts for uid, pts in game.scores.items()})
+        return game
+
+    async def resume(self):
+        """Pick a checkpointed game back up after a restart"""
+        if not self.game_started:
+            await self._send(f"♻️ The bot restarted. The lobby is still open with {len(self.player_ids)} players — use `/join` or `/start`.")
+            reaper.touch(self)
+            return
+        await self._send(f"♻️ The bot restarted. Resuming with round {self.current_round + 1}/{self.rounds_total}!")
+        await self.next_round()
+
+    async def _send(self, content, priority=NORMAL):
+        """Queue a message for the game channel behind more urgent traffic from other games"""
+        return await outbound.send(self.channel, content, priority)
+
+    async def _announce(self, kind, content):
+        """Send to the game channel and mirror the message to any spectators"""
+        # Scoreboards are superseded every round; reveals and results are what players wait on
+        await self._send(content, LOW if kind == "scores" else CRITICAL)
+        if self._events:
+            self._events.publish(kind, content)
+
     def set_cleanup_callback(self, callback):
         """Set the cleanup callback function"""
         self._cleanup_callback = callback
 
     async def _cleanup_game(self):
         """Helper method to clean up game from bot's games dictionary"""
+        reaper.forget(self)
+        self.log.flush()
+        if self.status:
+            self.status.close()
+            self.status = None
+        for uid in self.player_ids:
+            member_cache.cache.discard(self.guild_id, uid)
+        if self._events:
+            self._events.close()
         if hasattr(self, '_cleanup_callback') and self._cleanup_callback:
             await self._cleanup_callback()
 
@@ -431,7 +646,8 @@ class GameManager:
         sorted_scores = sorted(self.scores.items(), key=lambda x: -x[1])
         msg = "🏅 **Current Scores:**\n"
         for uid, score in sorted_scores:
-            user = discord.utils.get(self.guild.members, id=uid)
+            # Only current players are looked up; anyone else has left the game
+            user = await self._resolve_member(uid) if uid in self.player_ids else None
             if user:
                 msg += f"{user.display_name}: {score} pts\n"
             else:
@@ -439,18 +655,19 @@ class GameManager:
         await interaction.response.send_message(msg)
 
     async def end_game_with_results(self, reason):
-        await self.channel.send(f"**Game ended early! Reason:** {reason}")
+        self.log.emit("end", reason=reason)
+        await self._announce("final", f"**Game ended early! Reason:** {reason}")
         # Reveal imposter/question if available
-        if self.imposter:
-            await self.channel.send(f"The imposter was {self.imposter.mention}!")
+        if self.imposter_id:
+            await self._announce("final", f"The imposter was {mention(self.imposter_id)}!")
             if self.imposter_question:
-                await self.channel.send(f"❓ The imposter's question was: \"{self.imposter_question}\"")
+                await self._announce("final", f"❓ The imposter's question was: \"{self.imposter_question}\"")
         else:
-            await self.channel.send("Imposter data is not present.")
+            await self._announce("final", "Imposter data is not present.")
         # Show final scores
-        leaderboard = sorted([(player, self.scores.get(player.id, 0)) for player in self.players], key=lambda x: -x[1])
+        leaderboard = sorted([(uid, self.scores.get(uid, 0)) for uid in self.player_ids], key=lambda x: -x[1])
         msg = "\n🏆 **Final Scores:**\n"
-        for i, (player, score) in enumerate(leaderboard):
+        for i, (uid, score) in enumerate(leaderboard):
             if i == 0:
                 emoji = "🥇"
             elif i == 1:
@@ -459,17 +676,22 @@ class GameManager:
                 emoji = "🥉"
             else:
                 emoji = "🏅"
-            msg += f"{emoji} {player.mention} - {score} pts\n"
-        await self.channel.send(msg)
+            msg += f"{emoji} {mention(uid)} - {score} pts\n"
+        await self._announce("final", msg)
         if leaderboard and leaderboard[0][1] > 0:
             top_score = leaderboard[0][1]
-            winners = [player for player, score in leaderboard if score == top_score]
+            winners = [uid for uid, score in leaderboard if score == top_score]
             if len(winners) == 1:
-                await self.channel.send(f"🎉 **{winners[0].mention} wins the game!** 🎉")
+                await self._announce("final", f"🎉 **{mention(winners[0])} wins the game!** 🎉")
             else:
-                winner_mentions = ", ".join(w.mention for w in winners)
-                await self.channel.send(f"🤝 **It's a tie! Winners:** {winner_mentions} with {top_score} pts each!")
+                winner_mentions = ", ".join(mention(w) for w in winners)
+                await self._announce("final", f"🤝 **It's a tie! Winners:** {winner_mentions} with {top_score} pts each!")
         self.active = False
+        # Release a voting phase that is still waiting, so its coroutine exits instead of revealing results
+        if self.voting_open:
+            self.voting_open = False
+            if self.votes_done_event:
+                self.votes_done_event.set()
         await self._cleanup_game()
 
     async def force_end(self):
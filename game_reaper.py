@@ -0,0 +1,121 @@
+# game_reaper.py
+#
+# Ends lobbies and games nobody has touched for a while. Each game keeps its
+# last activity time; the heap holds one entry per game ordered by when it
+# could first expire, so a sweep only pops games that are due. A popped game
+# that saw activity (or changed phase) since it was queued is pushed back with
+# its new due time instead of being scanned on every sweep.
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+
+import metrics
+
+LOBBY = "lobby"
+ANSWERING = "answering"
+VOTING = "voting"
+
+# Idle time in seconds before a game in each phase is ended
+PHASE_TTLS = {
+    LOBBY: int(os.getenv("REAPER_LOBBY_TTL", "1800")),
+    ANSWERING: int(os.getenv("REAPER_ANSWER_TTL", "900")),
+    VOTING: int(os.getenv("REAPER_VOTE_TTL", "1200")),  # Longer than the 600s max timer, so only no-timer votes stall
+}
+SWEEP_INTERVAL = int(os.getenv("REAPER_INTERVAL", "30"))
+
+REASONS = {
+    LOBBY: "The lobby was idle for too long without being started.",
+    ANSWERING: "Nobody answered for too long.",
+    VOTING: "Nobody voted for too long.",
+}
+
+
+def phase_of(game):
+    if not game.game_started:
+        return LOBBY
+    if game.voting_open:
+        return VOTING
+    return ANSWERING
+
+
+class Reaper:
+    def __init__(self, ttls=None, interval=SWEEP_INTERVAL, clock=time.monotonic):
+        self.ttls = dict(ttls or PHASE_TTLS)
+        self.interval = interval
+        self.clock = clock
+        self._seq = itertools.count()
+        self._tracked = {}  # game: (last activity, seq of its live heap entry)
+        self._heap = []  # (due, seq, game)
+
+    def __len__(self):
+        return len(self._tracked)
+
+    def touch(self, game):
+        """Record activity; starts tracking the game the first time it is seen"""
+        now = self.clock()
+        entry = self._tracked.get(game)
+        if entry is not None:
+            # The queued entry stays put; the sweep re-queues it if it pops too early
+            self._tracked[game] = (now, entry[1])
+            return
+        seq = next(self._seq)
+        self._tracked[game] = (now, seq)
+        heapq.heappush(self._heap, (now + self.ttls[phase_of(game)], seq, game))
+
+    def forget(self, game):
+        self._tracked.pop(game, None)  # Its heap entry is dropped when it surfaces
+
+    def due(self, now=None):
+        """Pop and return the games that have been idle past their phase's TTL"""
+        now = self.clock() if now is None else now
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            _, seq, game = heapq.heappop(self._heap)
+            entry = self._tracked.get(game)
+            if entry is None or entry[1] != seq:
+                continue  # Forgotten, or tracked again under a newer entry
+            due = entry[0] + self.ttls[phase_of(game)] if game.active else now
+            if due > now:
+                heapq.heappush(self._heap, (due, seq, game))
+                continue
+            del self._tracked[game]
+            expired.append(game)
+        metrics.set_gauge("reaper.tracked", len(self._tracked))
+        return expired
+
+    async def sweep(self, now=None):
+        reaped = 0
+        for game in self.due(now):
+            if not game.active:
+                # Ended without reaching its cleanup (e.g. the host left before /start); just unregister it
+                metrics.incr("reaper.reaped.inactive")
+                await game._cleanup_game()
+                continue
+            phase = phase_of(game)
+            metrics.incr(f"reaper.reaped.{phase}")
+            try:
+                await game.end_game_with_results(REASONS[phase])
+            except Exception as e:
+                # The channel may be gone; make sure the game is still unregistered
+                print(f"Failed to announce reaped game in guild {game.guild_id}: {e}")
+                game.active = False
+                await game._cleanup_game()
+            reaped += 1
+        return reaped
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                reaped = await self.sweep()
+            except Exception as e:
+                print(f"Reaper sweep failed: {e}")
+                continue
+            if reaped:
+                print(f"Reaped {reaped} idle games")
+
+
+reaper = Reaper()
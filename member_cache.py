@@ -0,0 +1,71 @@
+# member_cache.py
+#
+# Bounded LRU of Member objects for game participants. In low-memory mode
+# discord.py keeps no member cache of its own, so members are filled in from
+# interactions and fetched on demand; in normal mode this simply fronts
+# guild.get_member.
+
+import os
+from collections import OrderedDict
+
+import discord
+
+import metrics
+
+LOW_MEMORY_MEMBERS = os.getenv("LOW_MEMORY_MEMBERS", "").lower() in ("1", "true", "yes")
+MEMBER_CACHE_SIZE = int(os.getenv("MEMBER_CACHE_SIZE", "10000"))
+
+
+class MemberCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._members = OrderedDict()  # (guild_id, user_id): Member
+
+    def __len__(self):
+        return len(self._members)
+
+    def put(self, member):
+        if not self.maxsize:
+            return
+        guild = getattr(member, "guild", None)
+        if guild is None:
+            return  # A plain User (e.g. from a DM) has no guild to key it by
+        key = (guild.id, member.id)
+        self._members[key] = member
+        self._members.move_to_end(key)
+        if len(self._members) > self.maxsize:
+            self._members.popitem(last=False)
+            metrics.incr("member_cache.evicted")
+
+    def get(self, guild, user_id):
+        """Cached member or None, without touching the API"""
+        key = (guild.id, user_id)
+        member = self._members.get(key)
+        if member is not None:
+            self._members.move_to_end(key)
+            metrics.incr("member_cache.hit")
+            return member
+        member = guild.get_member(user_id)
+        if member is not None:
+            self.put(member)
+        return member
+
+    async def fetch(self, guild, user_id):
+        """Cached member, falling back to one API call; None if they are not in the guild"""
+        member = self.get(guild, user_id)
+        if member is not None:
+            return member
+        metrics.incr("member_cache.fetch")
+        try:
+            member = await guild.fetch_member(user_id)
+        except discord.HTTPException:
+            return None
+        self.put(member)
+        return member
+
+    def discard(self, guild_id, user_id):
+        self._members.pop((guild_id, user_id), None)
+
+
+# With the normal member cache, guild.get_member already covers everyone and nothing is duplicated here
+cache = MemberCache(MEMBER_CACHE_SIZE if LOW_MEMORY_MEMBERS else 0)
@@ -0,0 +1,21 @@
+# metrics.py
+#
+# Process-wide counters and gauges, exposed as JSON on the keep-alive server's
+# /metrics endpoint. Updates happen on the event loop; the HTTP thread only
+# reads copies.
+
+_counters = {}
+_gauges = {}
+
+
+def incr(name, amount=1):
+    _counters[name] = _counters.get(name, 0) + amount
+
+
+def set_gauge(name, value):
+    _gauges[name] = value
+
+
+def snapshot():
+    """Copy of all current values"""
+    return {"counters": dict(_counters), "gauges": dict(_gauges)}
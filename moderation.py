@@ -0,0 +1,178 @@
+# moderation.py
+#
+# Answers are checked against a configurable word list before they are posted
+# in public. The words are compiled into one Aho-Corasick automaton, so a
+# round's answers are scanned in a single pass over their text whatever the
+# size of the list. Words only match whole words unless they end in `*`, which
+# matches any word starting with them. Lines starting with `re:` are regular
+# expressions instead; they are combined into one pattern and run per answer.
+#
+# Rounds with a lot of answer text are scanned in a worker thread so the event
+# loop keeps running meanwhile.
+#
+#   # moderation_words.txt
+#   badword
+#   slur*
+#   re:\bfree\s+nitro\b
+
+import asyncio
+import bisect
+import os
+import re
+from collections import deque
+
+import gil
+import metrics
+
+MODERATION_WORDS_PATH = os.getenv("MODERATION_WORDS_PATH", "moderation_words.txt")
+OFFLOOP_CHARS = int(os.getenv("MODERATION_OFFLOOP_CHARS", "20000"))  # More answer text than this is scanned in a thread
+SCAN_BATCH = 64  # Answers scanned between GIL hand-offs when running in a thread
+
+
+class WordFilter:
+    def __init__(self, words=(), patterns=()):
+        self._goto = [{}]  # state: {char: state}
+        self._fail = [0]
+        self._out = [()]  # state: ((length, whole word only, term), ...) for terms ending here
+        for word in words:
+            self._add(word)
+        self._link()
+        self._pattern = re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE) if patterns else None
+
+    def __bool__(self):
+        return len(self._goto) > 1 or self._pattern is not None
+
+    def _add(self, word):
+        term = word.strip().lower()
+        prefix = term.endswith("*")
+        term = term.rstrip("*")
+        if not term:
+            return
+        state = 0
+        for ch in term:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = self._goto[state][ch] = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] += ((len(term), not prefix, term),)
+
+    def _link(self):
+        """Failure links, breadth first; each state also inherits the terms its failure state ends"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] += self._out[self._fail[child]]
+
+    def scan(self, texts):
+        """The first matching term (or pattern match) for each text, None where it is clean"""
+        found = [None] * len(texts)
+        if len(self._goto) > 1:
+            # One pass over all answers; the newline between them is never part of a word
+            lowered = [text.lower() for text in texts]
+            joined = "\n".join(lowered)
+            starts = list(_offsets(lowered))
+            goto, fail, out = self._goto, self._fail, self._out
+            state = 0
+            for i, ch in enumerate(joined):
+                while True:
+                    nxt = goto[state].get(ch)
+                    if nxt is not None:
+                        state = nxt
+                        break
+                    if not state:
+                        break
+                    state = fail[state]
+                if out[state]:
+                    index = bisect.bisect_right(starts, i) - 1
+                    if found[index] is None:
+                        found[index] = _whole_word_match(joined, i, out[state])
+        if self._pattern is not None:
+            for index, text in enumerate(texts):
+                if found[index] is None:
+                    match = self._pattern.search(text)
+                    if match:
+                        found[index] = match.group(0)
+        return found
+
+
+def _offsets(texts):
+    offset = 0
+    for text in texts:
+        yield offset
+        offset += len(text) + 1
+
+
+def _whole_word_match(text, end, terms):
+    """The first of `terms` ending at `end` that isn't just part of a longer word"""
+    for length, whole, term in terms:
+        start = end - length + 1
+        if start > 0 and text[start - 1].isalnum():
+            continue
+        if whole and end + 1 < len(text) and text[end + 1].isalnum():
+            continue
+        return term
+    return None
+
+
+def load(path=None):
+    """Build a filter from a word list file; a missing file means no filtering"""
+    words, patterns = [], []
+    try:
+        with open(path or MODERATION_WORDS_PATH, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("re:"):
+                    patterns.append(line[3:])
+                else:
+                    words.append(line)
+    except FileNotFoundError:
+        pass
+    return WordFilter(words, patterns)
+
+
+_current = None
+
+
+def current():
+    """The active filter; loaded from MODERATION_WORDS_PATH on first use"""
+    global _current
+    if _current is None:
+        _current = load()
+    return _current
+
+
+def _scan_batched(word_filter, texts):
+    """Worker thread: scan in batches, handing the GIL back to the loop between them"""
+    found = []
+    for i in range(0, len(texts), SCAN_BATCH):
+        found += word_filter.scan(texts[i:i + SCAN_BATCH])
+        gil.hand_off()
+    return found
+
+
+async def flag_answers(answers):
+    """{user_id: matched term} for the answers in `answers` ({user_id: text}) that should not be posted"""
+    word_filter = current()
+    if not word_filter or not answers:
+        return {}
+    uids, texts = list(answers), list(answers.values())
+    if sum(len(text) for text in texts) > OFFLOOP_CHARS:
+        found = await asyncio.to_thread(_scan_batched, word_filter, texts)
+    else:
+        found = word_filter.scan(texts)
+    flagged = {uid: term for uid, term in zip(uids, found) if term is not None}
+    if flagged:
+        metrics.incr("moderation.hidden", len(flagged))
+    return flagged
@@ -0,0 +1,249 @@
+# outbound.py
+#
+# Process-wide queue for channel messages, DMs and edits. Every game used to
+# call send() directly, so a status edit in one game competed with another
+# game's question DMs for discord's global rate limit. Here each call is a job
+# with a priority class; one dispatcher hands out global send slots to the
+# most urgent job whose destination bucket (channel or DM) has capacity, so
+# critical messages jump the queue and no single channel hogs the budget.
+#
+# Callers still await their send and get the Message back (or the exception),
+# so per-game ordering is unchanged.
+
+import asyncio
+import heapq
+import itertools
+import os
+from collections import deque
+
+import metrics
+
+CRITICAL = 0  # Questions, reveals, results
+NORMAL = 1    # Lobby and tournament announcements, notices
+LOW = 2       # Status edits, scoreboards, spectator mirrors
+CLASS_NAMES = {CRITICAL: "critical", NORMAL: "normal", LOW: "low"}
+
+GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", "40"))  # Requests per second, under discord's 50/s
+BUCKET_BURST = 5          # Discord allows roughly 5 messages per 5s per channel
+BUCKET_RATE = 1.0
+MAX_IN_FLIGHT = int(os.getenv("OUTBOUND_MAX_IN_FLIGHT", "16"))
+MAX_LOW_QUEUED = int(os.getenv("OUTBOUND_MAX_LOW_QUEUED", "500"))  # Beyond this the oldest low-priority jobs are shed
+
+
+class Job:
+    __slots__ = ("priority", "seq", "bucket", "call", "future", "queued_at")
+
+    def __init__(self, priority, seq, bucket, call, future, queued_at):
+        self.priority = priority
+        self.seq = seq
+        self.bucket = bucket
+        self.call = call
+        self.future = future
+        self.queued_at = queued_at
+
+
+class Bucket:
+    """Token bucket for one destination, holding its pending jobs in priority order"""
+
+    __slots__ = ("jobs", "burst", "rate", "tokens", "updated", "waiting")
+
+    def __init__(self, now, burst, rate):
+        self.jobs = []  # (priority, seq, job)
+        self.burst = burst
+        self.rate = rate
+        self.tokens = burst
+        self.updated = now
+        self.waiting = False  # Already scheduled on the pacing heap
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def ready_at(self, now):
+        self.refill(now)
+        return now if self.tokens >= 1 else now + (1 - self.tokens) / self.rate
+
+
+class Outbound:
+    def __init__(self, global_rate=GLOBAL_RATE, bucket_burst=BUCKET_BURST, bucket_rate=BUCKET_RATE,
+                 max_in_flight=MAX_IN_FLIGHT, max_low_queued=MAX_LOW_QUEUED):
+        self.global_rate = global_rate
+        self.bucket_burst = bucket_burst
+        self.bucket_rate = bucket_rate
+        self.max_in_flight = max_in_flight
+        self.max_low_queued = max_low_queued
+        self._seq = itertools.count()
+        self._buckets = {}  # destination id: Bucket
+        self._ready = []    # (priority, seq, bucket key) for buckets with capacity now
+        self._paced = []    # (ready at, bucket key) for buckets out of tokens
+        self._low = {}      # seq: Job, oldest first, for shedding
+        self._idle = deque()  # (refilled by, bucket key) for buckets that ran empty
+        self._queued = {CRITICAL: 0, NORMAL: 0, LOW: 0}
+        self._loop = None
+        self._task = None
+        self._wakeup = None
+        self._slots = None
+        self._in_flight = 0
+        self._running = set()  # Strong references to in-flight send tasks
+        self._next_send = 0.0
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._task = loop.create_task(self._dispatch())
+        return loop
+
+    async def call(self, key, func, priority=NORMAL):
+        """Run `func()` (a coroutine factory) through the queue for destination `key`"""
+        loop = self._ensure_running()
+        now = loop.time()
+        job = Job(priority, next(self._seq), key, func, loop.create_future(), now)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = Bucket(now, self.bucket_burst, self.bucket_rate)
+        heapq.heappush(bucket.jobs, (priority, job.seq, job))
+        if not bucket.waiting:
+            heapq.heappush(self._ready, (priority, job.seq, key))
+        self._queued[priority] += 1
+        if priority == LOW:
+            self._low[job.seq] = job
+            if len(self._low) > self.max_low_queued:
+                self._shed(next(iter(self._low.values())))
+        self._update_gauges()
+        self._wakeup.set()
+        return await job.future
+
+    async def send(self, target, content=None, priority=NORMAL, **kwargs):
+        """target.send(...) for a channel, thread or member, queued by priority"""
+        return await self.call(target.id, lambda: target.send(content, **kwargs), priority)
+
+    async def edit(self, message, content=None, priority=LOW, **kwargs):
+        return await self.call(message.channel.id, lambda: message.edit(content=content, **kwargs), priority)
+
+    @property
+    def queued(self):
+        return sum(self._queued.values())
+
+    async def drain(self, timeout):
+        """Wait up to `timeout` seconds for everything queued to be sent"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while (self.queued or self._in_flight) and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+
+    def _shed(self, job):
+        """Drop a queued low-priority job; its caller gets None instead of a Message"""
+        self._low.pop(job.seq, None)
+        bucket = self._buckets[job.bucket]
+        bucket.jobs.remove((job.priority, job.seq, job))
+        heapq.heapify(bucket.jobs)
+        if bucket.jobs and not bucket.waiting:
+            # The ready entry pointed at the shed job; jobs queued while the bucket was paced have none of their own
+            head_priority, head_seq, _ = bucket.jobs[0]
+            heapq.heappush(self._ready, (head_priority, head_seq, job.bucket))
+        self._queued[job.priority] -= 1
+        metrics.incr("outbound.shed")
+        if not job.future.done():
+            job.future.set_result(None)
+
+    def _update_gauges(self):
+        for priority, name in CLASS_NAMES.items():
+            metrics.set_gauge(f"outbound.queued.{name}", self._queued[priority])
+
+    def _next_job(self, now):
+        """Most urgent job whose bucket has capacity, or None"""
+        # A bucket left empty long enough to refill completely is the same as a fresh one
+        while self._idle and self._idle[0][0] <= now:
+            _, key = self._idle.popleft()
+            bucket = self._buckets.get(key)
+            if bucket is not None and not bucket.jobs and not bucket.waiting and bucket.ready_at(now) == now:
+                del self._buckets[key]
+        # Buckets whose pacing delay has passed become eligible again
+        while self._paced and self._paced[0][0] <= now:
+            _, key = heapq.heappop(self._paced)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                continue
+            bucket.waiting = False
+            if bucket.jobs:
+                priority, seq, _ = bucket.jobs[0]
+                heapq.heappush(self._ready, (priority, seq, key))
+        while self._ready:
+            priority, seq, key = heapq.heappop(self._ready)
+            bucket = self._buckets.get(key)
+            if bucket is None or bucket.waiting or not bucket.jobs or bucket.jobs[0][1] != seq:
+                continue  # Stale entry: the bucket's head changed since it was pushed
+            ready_at = bucket.ready_at(now)
+            if ready_at > now:
+                bucket.waiting = True
+                heapq.heappush(self._paced, (ready_at, key))
+                continue
+            _, _, job = heapq.heappop(bucket.jobs)
+            bucket.tokens -= 1
+            if bucket.jobs:
+                head_priority, head_seq, _ = bucket.jobs[0]
+                heapq.heappush(self._ready, (head_priority, head_seq, key))
+            else:
+                self._idle.append((now + bucket.burst / bucket.rate, key))
+            return job
+        return None
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.global_rate
+        while True:
+            await self._slots.acquire()
+            # Global pacing first, so the choice of job below is made as late as possible
+            delay = self._next_send - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            while True:
+                now = loop.time()
+                job = self._next_job(now)
+                if job is not None:
+                    break
+                self._wakeup.clear()
+                timeout = self._paced[0][0] - now if self._paced else None
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            self._next_send = max(now, self._next_send) + interval
+            self._queued[job.priority] -= 1
+            self._low.pop(job.seq, None)
+            name = CLASS_NAMES[job.priority]
+            metrics.incr(f"outbound.sent.{name}")
+            metrics.incr(f"outbound.wait_ms.{name}", int((now - job.queued_at) * 1000))
+            self._update_gauges()
+            self._in_flight += 1
+            task = loop.create_task(self._run(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, job):
+        try:
+            result = await job.call()
+        except Exception as e:
+            metrics.incr("outbound.failed")
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+
+scheduler = Outbound()
+
+
+async def send(target, content=None, priority=NORMAL, **kwargs):
+    return await scheduler.send(target, content, priority, **kwargs)
+
+
+async def edit(message, content=None, priority=LOW, **kwargs):
+    return await scheduler.edit(message, content, priority, **kwargs)
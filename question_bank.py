@@ -0,0 +1,232 @@
+# question_bank.py
+#
+# The question pairs games draw from, as an immutable snapshot that can be
+# replaced while the bot is running. Games keep a reference to the bank they
+# started with. Each column of questions is one UTF-8 buffer plus an array of
+# end offsets rather than a list of strings.
+#
+# A reload parses the file in a child process, which writes the validated
+# pairs to a temporary file as JSON lines. A worker thread decodes that file
+# into a new bank and builds its selection index, and the bank is then swapped
+# in with a single assignment.
+#
+#   python question_bank.py questions_custom.py out.jsonl   # what the child runs
+
+import argparse
+import ast
+import asyncio
+import bisect
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+from array import array
+
+import gil
+import question_stats
+
+QUESTIONS_PATH = os.getenv("QUESTIONS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "questions_custom.py"))
+INLINE_INDEX_LIMIT = 5000  # Banks up to this size rebuild their index on the loop; larger ones use a thread
+DECODE_BATCH = 250  # Pairs decoded between deliberate GIL hand-offs to the event loop
+
+
+def validate(pairs):
+    """Validate that all question pairs are properly formatted"""
+    for i, pair in enumerate(pairs):
+        if not isinstance(pair, dict) or 'normal' not in pair or 'imposter' not in pair:
+            raise ValueError(f"Invalid question pair at index {i}: {pair}")
+        if not pair['normal'] or not pair['imposter']:
+            raise ValueError(f"Empty question found at index {i}")
+    return True
+
+
+def parse_file(path):
+    """Read QUESTION_PAIRS from a questions module without executing it"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "QUESTION_PAIRS" for t in node.targets):
+            pairs = ast.literal_eval(node.value)
+            break
+    else:
+        raise ValueError(f"{path} does not define QUESTION_PAIRS")
+    if not isinstance(pairs, list):
+        raise ValueError("QUESTION_PAIRS must be a list")
+    validate(pairs)
+    return pairs
+
+
+class Column:
+    """Strings packed into one UTF-8 buffer; freeing it costs the same however many it holds"""
+
+    __slots__ = ("_data", "_ends")
+
+    def __init__(self, data, ends):
+        self._data = data
+        self._ends = ends  # array("Q") of byte offsets where each string ends
+
+    @classmethod
+    def pack(cls, strings):
+        encoded = [s.encode("utf-8") for s in strings]
+        return cls(b"".join(encoded), array("Q", itertools.accumulate(map(len, encoded))))
+
+    def __len__(self):
+        return len(self._ends)
+
+    def __getitem__(self, i):
+        start = self._ends[i - 1] if i else 0
+        return self._data[start:self._ends[i]].decode("utf-8")
+
+
+class QuestionBank:
+    def __init__(self, normals, imposters, version=1):
+        self.normals = normals
+        self.imposters = imposters
+        self.version = version
+        self._index = (None, None)  # (weights dict it was built from, cumulative weights or None)
+        self._rebuild_task = None
+
+    @classmethod
+    def from_pairs(cls, pairs, version=1):
+        return cls(Column.pack([p["normal"] for p in pairs]), Column.pack([p["imposter"] for p in pairs]), version)
+
+    def __len__(self):
+        return len(self.normals)
+
+    def pair(self, i):
+        return {"normal": self.normals[i], "imposter": self.imposters[i]}
+
+    def build_index(self):
+        """Cumulative weights for O(log n) weighted picks; None when there are no weights yet"""
+        weights = question_stats.load_weights()
+        cumulative = None
+        if weights:
+            cumulative = list(itertools.accumulate(
+                weights.get(f"{question_stats.pair_key(self.pair(i)):016x}", 1.0) for i in range(len(self))
+            ))
+        self._index = (weights, cumulative)
+
+    def choose(self, rng=random):
+        """Pick a question pair, weighted by how balanced it has played so far"""
+        if question_stats.load_weights() is not self._index[0]:
+            self._refresh_index()
+        cumulative = self._index[1]
+        if not cumulative:
+            # One rng.random() draw either way, so a replay stays in step with the recording whatever the weights were
+            return self.pair(int(rng.random() * len(self)))
+        return self.pair(bisect.bisect_right(cumulative, rng.random() * cumulative[-1]))
+
+    def _refresh_index(self):
+        if len(self) <= INLINE_INDEX_LIMIT:
+            self.build_index()
+            return
+        if self._rebuild_task and not self._rebuild_task.done():
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.build_index()
+            return
+        # Keep picking from the previous index until the new one is ready
+        self._rebuild_task = asyncio.create_task(asyncio.to_thread(self.build_index))
+
+
+_current = None
+
+
+def current():
+    """The live bank; loaded from QUESTIONS_PATH on first use and validated as a reload would be"""
+    global _current
+    if _current is None:
+        bank = QuestionBank.from_pairs(parse_file(QUESTIONS_PATH))
+        if not bank:
+            raise ValueError("The question bank is empty")
+        bank.build_index()
+        _current = bank
+    return _current
+
+
+def _pack_batch(packed, batch):
+    """Append a batch of encoded strings to each column's chunks and end offsets"""
+    for (chunks, ends), strings in zip(packed, batch):
+        offset = ends[-1] if ends else 0
+        ends.extend(offset + end for end in itertools.accumulate(map(len, strings)))
+        chunks.append(b"".join(strings))
+        strings.clear()
+
+
+def _decode(path, version):
+    """Worker thread: alternating JSON string lines (normal, imposter), decoded and packed piecemeal so the GIL keeps changing hands"""
+    with open(path, "rb") as f:
+        output = f.read()
+    os.remove(path)  # Unlinking megabytes takes milliseconds of filesystem work; not on the loop
+    packed = ([], array("Q")), ([], array("Q"))  # (chunks, end offsets) for normals, imposters
+    batch = [], []
+    start = column = 0
+    while True:
+        end = output.find(b"\n", start)
+        if end == -1:
+            break
+        batch[column].append(json.loads(output[start:end]).encode("utf-8"))
+        start = end + 1
+        column ^= 1
+        if not column and len(batch[0]) == DECODE_BATCH:
+            _pack_batch(packed, batch)
+            gil.hand_off()
+    _pack_batch(packed, batch)
+    normals, imposters = (Column(b"".join(chunks), ends) for chunks, ends in packed)
+    bank = QuestionBank(normals, imposters, version)
+    bank.build_index()
+    return bank
+
+
+async def reload(path=None):
+    """Parse, validate and index a question file off the loop, then swap it in; raises ValueError if invalid"""
+    global _current
+    path = path or QUESTIONS_PATH
+    # The output goes through a file rather than a pipe: collecting megabytes from a pipe happens on the loop
+    fd, out_path = tempfile.mkstemp(suffix=".jsonl", prefix="questions-")
+    os.close(fd)
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.abspath(__file__), path, out_path,
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
+        )
+        _, errors = await proc.communicate()
+        if proc.returncode != 0:
+            lines = errors.decode("utf-8", "replace").strip().splitlines()
+            raise ValueError(lines[-1] if lines else f"Question parser exited with status {proc.returncode}")
+        bank = await asyncio.to_thread(_decode, out_path, current().version + 1)
+    finally:
+        if os.path.exists(out_path):  # Left behind only when parsing or decoding failed
+            os.remove(out_path)
+    if not bank:
+        raise ValueError("The new question bank is empty")
+    _current = bank
+    return bank
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a question file and write each pair as two JSON string lines")
+    parser.add_argument("source", help="Python file defining QUESTION_PAIRS")
+    parser.add_argument("output", help="Where to write the pairs")
+    args = parser.parse_args()
+    if hasattr(os, "sched_setscheduler"):
+        # Parsing is background work: run only when the bot's process leaves the CPU idle
+        os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+    try:
+        pairs = parse_file(args.source)
+    except (OSError, SyntaxError, ValueError) as e:
+        print(f"{type(e).__name__}: {e}", file=sys.stderr)
+        sys.exit(1)
+    with open(args.output, "w", encoding="utf-8") as out:
+        for pair in pairs:
+            for text in (pair["normal"], pair["imposter"]):
+                out.write(json.dumps(text, ensure_ascii=False))
+                out.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# question_stats.py
+#
+# Per-pair round outcomes are appended to a compact binary store (one fixed-size
+# record per round). The aggregation job streams that store in chunks, so memory
+# is bounded by the number of distinct pairs rather than the number of rounds,
+# and writes a weights file that question selection picks up automatically.
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import time
+
+STATS_PATH = os.getenv("QUESTION_STATS_PATH", "question_stats.bin")
+WEIGHTS_PATH = os.getenv("QUESTION_WEIGHTS_PATH", "question_weights.json")
+
+# Round outcomes
+CAUGHT = 0
+ESCAPED = 1
+TIE = 2
+NO_VOTES = 3
+OUTCOME_NAMES = {CAUGHT: "caught", ESCAPED: "escaped", TIE: "tie", NO_VOTES: "no_votes"}
+
+# pair key, outcome, players, votes for imposter, total votes, unix timestamp
+RECORD = struct.Struct("<QBHHHI")
+CHUNK_RECORDS = 65536
+
+# Beta prior used to smooth catch rates for pairs with few rounds
+PRIOR_CAUGHT = 2
+PRIOR_ROUNDS = 4
+MIN_WEIGHT = 0.1
+
+
+def pair_key(pair):
+    """Stable 64-bit key for a question pair, independent of its position in the list"""
+    text = f"{pair['normal']}\x1f{pair['imposter']}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(text, digest_size=8).digest(), "little")
+
+
+def record_round(pair, outcome, players, votes_for_imposter, votes_total, path=None):
+    """Append one round outcome to the store"""
+    data = RECORD.pack(
+        pair_key(pair),
+        outcome,
+        min(players, 0xFFFF),
+        min(votes_for_imposter, 0xFFFF),
+        min(votes_total, 0xFFFF),
+        int(time.time()),
+    )
+    with open(path or STATS_PATH, "ab") as f:
+        f.write(data)
+
+
+def iter_records(path=None):
+    """Stream records from the store one chunk at a time"""
+    chunk_size = RECORD.size * CHUNK_RECORDS
+    with open(path or STATS_PATH, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            # Ignore a trailing partial record left by an interrupted write
+            usable = len(chunk) - len(chunk) % RECORD.size
+            yield from RECORD.iter_unpack(chunk[:usable])
+
+
+def aggregate(path=None):
+    """Fold the store into per-pair counters: key -> [rounds, caught, tie, no_votes, votes_for_imposter, votes_total]"""
+    totals = {}
+    for key, outcome, _players, for_imposter, votes_total, _ts in iter_records(path):
+        row = totals.get(key)
+        if row is None:
+            row = totals[key] = [0, 0, 0, 0, 0, 0]
+        row[0] += 1
+        if outcome == CAUGHT:
+            row[1] += 1
+        elif outcome == TIE:
+            row[2] += 1
+        elif outcome == NO_VOTES:
+            row[3] += 1
+        row[4] += for_imposter
+        row[5] += votes_total
+    return totals
+
+
+def catch_rate(rounds, caught):
+    return (caught + PRIOR_CAUGHT) / (rounds + PRIOR_ROUNDS)
+
+
+def pair_weight(rounds, caught):
+    """Pairs caught about half the time are balanced; very easy or very hard pairs are picked less often"""
+    return max(MIN_WEIGHT, 1 - 2 * abs(catch_rate(rounds, caught) - 0.5))
+
+
+def compute_weights(totals):
+    return {f"{key:016x}": round(pair_weight(row[0], row[1]), 4) for key, row in totals.items()}
+
+
+def write_weights(weights, path=None):
+    path = path or WEIGHTS_PATH
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(weights, f)
+    os.replace(tmp, path)
+
+
+NO_WEIGHTS = {}  # Returned while there is no weights file; the same object every time, so callers can cache on identity
+_weights_cache = {"mtime": None, "weights": NO_WEIGHTS}
+
+
+def load_weights(path=None):
+    """Load the weights file, re-reading it only when the aggregation job has rewritten it"""
+    path = path or WEIGHTS_PATH
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return NO_WEIGHTS
+    if _weights_cache["mtime"] != mtime:
+        try:
+            with open(path, encoding="utf-8") as f:
+                _weights_cache["weights"] = json.load(f)
+        except (OSError, ValueError):
+            _weights_cache["weights"] = {}
+        _weights_cache["mtime"] = mtime
+    return _weights_cache["weights"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate question pair outcomes into selection weights")
+    parser.add_argument("--store", default=STATS_PATH, help="Round outcome store to read")
+    parser.add_argument("--out", default=WEIGHTS_PATH, help="Weights file to write")
+    parser.add_argument("--top", type=int, default=10, help="How many of the most unbalanced pairs to list")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.store):
+        print(f"No outcome store found at {args.store}")
+        return
+
+    totals = aggregate(args.store)
+    write_weights(compute_weights(totals), args.out)
+    rounds = sum(row[0] for row in totals.values())
+    print(f"Aggregated {rounds} rounds across {len(totals)} pairs -> {args.out}")
+
+    from questions_custom import QUESTION_PAIRS
+    names = {pair_key(p): p["normal"] for p in QUESTION_PAIRS}
+    ranked = sorted(totals.items(), key=lambda item: -abs(catch_rate(item[1][0], item[1][1]) - 0.5))
+    for key, (n, caught, tie, no_votes, for_imposter, votes_total) in ranked[:args.top]:
+        spread = for_imposter / votes_total if votes_total else 0.0
+        print(
+            f"{catch_rate(n, caught):5.0%} caught | {n:6d} rounds | ties {tie} | no votes {no_votes} | "
+            f"imposter vote share {spread:4.0%} | {names.get(key, f'{key:016x} (no longer in bank)')}"
+        )
+
+
+if __name__ == "__main__":
+    main()
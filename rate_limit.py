@@ -0,0 +1,80 @@
+# rate_limit.py
+#
+# Per-user command throttling. Each (guild, user) pair gets a token bucket that
+# refills lazily when it is checked, so a check is a dict lookup and a little
+# arithmetic. Buckets live in an LRU capped at `maxsize`; evicting one only
+# forgets a user who has been quiet longer than everyone else in the cache.
+
+import math
+import os
+import time
+from collections import OrderedDict
+
+import metrics
+
+COMMAND_BURST = float(os.getenv("COMMAND_BURST", "5"))    # Commands a user can send back to back
+COMMAND_RATE = float(os.getenv("COMMAND_RATE", "1"))      # Commands per second after that
+COMMAND_LIMITER_SIZE = int(os.getenv("COMMAND_LIMITER_SIZE", "50000"))
+
+
+class Bucket:
+    __slots__ = ("tokens", "updated", "warned")
+
+    def __init__(self, tokens, updated):
+        self.tokens = tokens
+        self.updated = updated
+        self.warned = False  # Already told they are being throttled in this dry spell
+
+
+class RateLimiter:
+    def __init__(self, burst=COMMAND_BURST, rate=COMMAND_RATE, maxsize=COMMAND_LIMITER_SIZE, clock=time.monotonic):
+        self.burst = burst
+        self.rate = rate
+        self.maxsize = maxsize
+        self.clock = clock
+        self._buckets = OrderedDict()  # (guild_id, user_id): Bucket
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def check(self, guild_id, user_id):
+        """Take a token; returns (allowed, should_warn)"""
+        now = self.clock()
+        key = (guild_id, user_id)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = Bucket(self.burst, now)
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+                metrics.incr("ratelimit.evicted")
+        else:
+            self._buckets.move_to_end(key)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            bucket.warned = False
+            return True, False
+        metrics.incr("ratelimit.throttled")
+        # Only the first rejected command gets a reply; the rest are dropped without any API call
+        should_warn = not bucket.warned
+        bucket.warned = True
+        return False, should_warn
+
+    def retry_after(self, guild_id, user_id):
+        bucket = self._buckets.get((guild_id, user_id))
+        if bucket is None or bucket.tokens >= 1:
+            return 0.0
+        return (1 - bucket.tokens) / self.rate
+
+
+limiter = RateLimiter()
+
+
+async def check_interaction(interaction):
+    """False if the user is over their limit; the first rejection in a row gets an ephemeral notice"""
+    allowed, should_warn = limiter.check(interaction.guild_id, interaction.user.id)
+    if not allowed and should_warn:
+        wait = limiter.retry_after(interaction.guild_id, interaction.user.id)
+        await interaction.response.send_message(f"You're sending commands too fast. Try again in {math.ceil(wait)}s.", ephemeral=True)
+    return allowed
@@ -0,0 +1,80 @@
+# status_message.py
+#
+# A single channel message that is edited in place as a round progresses.
+# Updates are coalesced: at most one edit per `min_interval` seconds, always
+# carrying the latest content, so a burst of answers or votes costs one edit.
+
+import asyncio
+
+import discord
+
+import metrics
+import outbound
+
+MIN_EDIT_INTERVAL = 10.0
+
+
+class LiveStatus:
+    def __init__(self, channel, min_interval=MIN_EDIT_INTERVAL):
+        self.channel = channel
+        self.min_interval = min_interval
+        self.message = None
+        self._shown = None  # Content currently visible in the channel
+        self._pending = None  # Latest content not yet pushed
+        self._last_edit = 0.0
+        self._flush_task = None
+
+    async def start(self, content):
+        # The first post announces the phase, so it goes out ahead of other games' low-priority traffic
+        self.message = await outbound.send(self.channel, content, outbound.CRITICAL)
+        if self.message is None:
+            return None
+        self._shown = content
+        self._last_edit = asyncio.get_running_loop().time()
+        return self.message
+
+    def update(self, content):
+        """Schedule an edit; repeated calls before it runs are merged into one"""
+        if self.message is None or content == self._shown:
+            self._pending = None
+            return
+        if self._pending is not None:
+            metrics.incr("status.coalesced")
+        self._pending = content
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def finish(self, content):
+        """Push the final content immediately and stop any scheduled edit"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._pending = None
+        await self._edit(content, outbound.NORMAL)
+
+    def close(self):
+        """Drop any scheduled edit and the message reference without touching the channel"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._pending = None
+        self.message = None
+
+    async def _flush_later(self):
+        loop = asyncio.get_running_loop()
+        delay = self._last_edit + self.min_interval - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        content, self._pending = self._pending, None
+        if content is not None:
+            await self._edit(content)
+
+    async def _edit(self, content, priority=outbound.LOW):
+        if self.message is None or content == self._shown:
+            return
+        try:
+            if await outbound.edit(self.message, content, priority) is None:
+                return  # Shed under backpressure; the next update carries newer content anyway
+            self._shown = content
+            metrics.incr("status.edits")
+        except discord.HTTPException:
+            metrics.incr("status.failed")
+        self._last_edit = asyncio.get_running_loop().time()
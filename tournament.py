@@ -0,0 +1,173 @@
+# tournament.py
+#
+# Bracket play on top of GameManager: participants are split into lobbies, each
+# lobby is an ordinary game running in its own thread, and the best players of
+# every lobby advance until one final lobby decides the champion.
+
+import asyncio
+import math
+import random
+
+import discord
+
+import outbound
+from game_manager import GameManager, mention
+
+MIN_LOBBY_SIZE = 3
+
+
+def split_into_lobbies(players, lobby_size):
+    """Shuffle and deal players into as many lobbies as needed, keeping every lobby at 3+ players"""
+    players = list(players)
+    random.shuffle(players)
+    count = max(1, min(math.ceil(len(players) / lobby_size), len(players) // MIN_LOBBY_SIZE))
+    lobbies = [[] for _ in range(count)]
+    for i, player in enumerate(players):
+        lobbies[i % count].append(player)
+    return lobbies
+
+
+class Tournament:
+    def __init__(self, client, guild_id, host_id, channel, lobby_size=6, advance=1, rounds=3, timer=90,
+                 max_concurrent_lobbies=25, spawn_interval=1.0):
+        self.client = client
+        self.guild_id = guild_id
+        self.host_id = host_id
+        self.channel = channel
+        self.lobby_size = lobby_size
+        self.advance = advance  # Winners per lobby; must stay below MIN_LOBBY_SIZE so every stage shrinks
+        self.rounds = rounds
+        self.timer = timer
+        self.participants = []  # user ids in sign-up order
+        self.scores = {}  # user_id: points across all stages
+        self.stage = 0
+        self.started = False
+        self.active = True
+        self.lobbies = {}  # thread_id: GameManager for lobbies currently running
+        self.task = None
+        self._slots = asyncio.Semaphore(max_concurrent_lobbies)
+        self._spawn_lock = asyncio.Lock()
+        self._spawn_interval = spawn_interval  # Pacing between thread creations to stay clear of rate limits
+        # Hooks so the bot can route commands sent inside a lobby thread to its game
+        self.on_lobby_start = None
+        self.on_lobby_end = None
+
+    def add_participant(self, user_id):
+        if user_id in self.participants:
+            return False
+        self.participants.append(user_id)
+        return True
+
+    def remove_participant(self, user_id):
+        if user_id in self.participants:
+            self.participants.remove(user_id)
+
+    def lobby_timeout(self):
+        """Upper bound on how long one lobby may run before it is force ended"""
+        return self.rounds * (self.timer + 300)
+
+    async def run(self):
+        self.started = True
+        alive = list(self.participants)
+        try:
+            while self.active and len(alive) > self.lobby_size:
+                alive = await self._run_stage(alive)
+            if self.active and len(alive) >= MIN_LOBBY_SIZE:
+                alive = await self._run_stage(alive, final=True)
+            if self.active:
+                await self._announce_champion(alive)
+        finally:
+            self.active = False
+
+    async def _run_stage(self, players, final=False):
+        self.stage += 1
+        lobbies = split_into_lobbies(players, self.lobby_size) if not final else [list(players)]
+        label = "Final" if final else f"Stage {self.stage}"
+        await outbound.send(
+            self.channel,
+            f"🏟️ **{label}** — {len(players)} players in {len(lobbies)} lobb{'y' if len(lobbies) == 1 else 'ies'}. "
+            f"Check the new threads for your lobby!",
+        )
+        winners_per_lobby = 1 if final else self.advance
+        results = await asyncio.gather(*(
+            self._run_lobby(i + 1, group, label, winners_per_lobby) for i, group in enumerate(lobbies)
+        ))
+        winners = [player for lobby_winners in results for player in lobby_winners]
+        if not final and len(winners) < MIN_LOBBY_SIZE:
+            # Too few lobbies to fill a final; top it up with the best of the rest
+            advanced = set(winners)
+            wildcards = self._top([uid for uid in players if uid not in advanced], {}, MIN_LOBBY_SIZE - len(winners))
+            winners.extend(wildcards)
+        return winners
+
+    async def _run_lobby(self, number, group, label, winners):
+        async with self._slots:
+            if not self.active:
+                return []
+            async with self._spawn_lock:
+                try:
+                    thread = await self.channel.create_thread(
+                        name=f"{label} - Lobby {number}",
+                        type=discord.ChannelType.public_thread,
+                    )
+                except discord.HTTPException:
+                    thread = None
+                await asyncio.sleep(self._spawn_interval)
+            if thread is None:
+                # Could not open a thread for this lobby; fall back to tournament standings
+                return self._top(group, {}, winners)
+
+            game = GameManager(self.client, self.guild_id, self.host_id, rounds=self.rounds, timer=self.timer, anonymous=None)
+            done = asyncio.get_running_loop().create_future()
+
+            async def cleanup_callback():
+                if not done.done():
+                    done.set_result(None)
+            game._cleanup_callback = cleanup_callback
+
+            self.lobbies[thread.id] = game
+            if self.on_lobby_start:
+                self.on_lobby_start(thread.id, game)
+            try:
+                await outbound.send(thread, " ".join(mention(uid) for uid in group) + f"\nWelcome to **{label} - Lobby {number}**! Your first question is on its way.")
+                await game.begin_with_players(thread, group)
+                try:
+                    await asyncio.wait_for(asyncio.shield(done), timeout=self.lobby_timeout())
+                except asyncio.TimeoutError:
+                    if game.active:
+                        await game.end_game_with_results("Tournament lobby ran out of time.")
+            finally:
+                self.lobbies.pop(thread.id, None)
+                if self.on_lobby_end:
+                    self.on_lobby_end(thread.id)
+
+            for uid, points in game.scores.items():
+                self.scores[uid] = self.scores.get(uid, 0) + points
+            # Only players still in the lobby at the end can advance
+            return self._top(game.player_ids, game.scores, winners)
+
+    def _top(self, players, lobby_scores, count):
+        ranked = sorted(
+            players,
+            key=lambda uid: (lobby_scores.get(uid, 0), self.scores.get(uid, 0), random.random()),
+            reverse=True,
+        )
+        return ranked[:count]
+
+    async def _announce_champion(self, finalists):
+        standings = sorted(self.scores.items(), key=lambda x: -x[1])[:10]
+        msg = "🏆 **Tournament Standings:**\n"
+        for i, (uid, score) in enumerate(standings):
+            msg += f"{i + 1}. {mention(uid)} - {score} pts\n"
+        await outbound.send(self.channel, msg, outbound.CRITICAL)
+        if finalists:
+            champion = self._top(finalists, {}, 1)[0]
+            await outbound.send(self.channel, f"👑 **{mention(champion)} is the tournament champion!** 👑", outbound.CRITICAL)
+        else:
+            await outbound.send(self.channel, "The tournament ended without a champion.", outbound.CRITICAL)
+
+    async def cancel(self):
+        self.active = False
+        for game in list(self.lobbies.values()):
+            if game.active:
+                await game.force_end()